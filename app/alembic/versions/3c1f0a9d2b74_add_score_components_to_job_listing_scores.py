@@ -0,0 +1,39 @@
+"""add score components to job listing scores
+
+Revision ID: 3c1f0a9d2b74
+Revises: 8b96abbb865a
+Create Date: 2025-05-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f0a9d2b74'
+down_revision: Union[str, None] = '8b96abbb865a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Heuristic sub-scores and the model score, left NULL for rows scored before this migration
+    op.add_column('job_listing_scores', sa.Column('price_score', sa.Float(), nullable=True))
+    op.add_column('job_listing_scores', sa.Column('size_score', sa.Float(), nullable=True))
+    op.add_column('job_listing_scores', sa.Column('bedrooms_score', sa.Float(), nullable=True))
+    op.add_column('job_listing_scores', sa.Column('bathrooms_score', sa.Float(), nullable=True))
+    op.add_column('job_listing_scores', sa.Column('aesthetic_score', sa.Float(), nullable=True))
+    op.add_column('job_listing_scores', sa.Column('heuristic_trace', sa.String(), nullable=True))
+    op.add_column('job_listing_scores', sa.Column('aesthetic_trace', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('job_listing_scores', 'aesthetic_trace')
+    op.drop_column('job_listing_scores', 'heuristic_trace')
+    op.drop_column('job_listing_scores', 'aesthetic_score')
+    op.drop_column('job_listing_scores', 'bathrooms_score')
+    op.drop_column('job_listing_scores', 'bedrooms_score')
+    op.drop_column('job_listing_scores', 'size_score')
+    op.drop_column('job_listing_scores', 'price_score')
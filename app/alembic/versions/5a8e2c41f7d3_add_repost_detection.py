@@ -0,0 +1,47 @@
+"""add repost detection fingerprints
+
+Revision ID: 5a8e2c41f7d3
+Revises: 3c1f0a9d2b74
+Create Date: 2025-05-22 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a8e2c41f7d3'
+down_revision: Union[str, None] = '3c1f0a9d2b74'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('listings', sa.Column('description_simhash', sa.BigInteger(), nullable=True))
+    op.add_column('listings', sa.Column('image_dhash', sa.BigInteger(), nullable=True))
+    op.add_column('listings', sa.Column('canonical_listing_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_foreign_key('fk_listings_canonical_listing_id', 'listings', 'listings', ['canonical_listing_id'], ['id'])
+    op.create_index('ix_listings_canonical_listing_id', 'listings', ['canonical_listing_id'])
+
+    # Primary key leads with (kind, band, value) so candidate lookups are index scans
+    op.create_table(
+        'listing_fingerprint_bands',
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('band', sa.Integer(), nullable=False),
+        sa.Column('value', sa.Integer(), nullable=False),
+        sa.Column('listing_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('kind', 'band', 'value', 'listing_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('listing_fingerprint_bands')
+    op.drop_index('ix_listings_canonical_listing_id', 'listings')
+    op.drop_constraint('fk_listings_canonical_listing_id', 'listings', type_='foreignkey')
+    op.drop_column('listings', 'canonical_listing_id')
+    op.drop_column('listings', 'image_dhash')
+    op.drop_column('listings', 'description_simhash')
@@ -0,0 +1,46 @@
+"""add listing change tracking and price history
+
+Revision ID: 7d2b6e90c1a5
+Revises: 5a8e2c41f7d3
+Create Date: 2025-05-24 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2b6e90c1a5'
+down_revision: Union[str, None] = '5a8e2c41f7d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('listings', sa.Column('content_fingerprint', sa.String(), nullable=True))
+    op.add_column('listings', sa.Column('last_scraped_at', sa.DateTime(timezone=True), server_default=sa.text('now()')))
+    op.add_column('job_listing_scores', sa.Column('needs_reevaluation', sa.Boolean(), server_default='false', nullable=False))
+
+    op.create_table(
+        'listing_history',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('listing_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('field', sa.String(), nullable=False),
+        sa.Column('old_value', sa.String(), nullable=True),
+        sa.Column('new_value', sa.String(), nullable=True),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_listing_history_listing_id', 'listing_history', ['listing_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listing_history_listing_id', 'listing_history')
+    op.drop_table('listing_history')
+    op.drop_column('job_listing_scores', 'needs_reevaluation')
+    op.drop_column('listings', 'last_scraped_at')
+    op.drop_column('listings', 'content_fingerprint')
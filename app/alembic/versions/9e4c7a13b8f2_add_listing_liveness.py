@@ -0,0 +1,30 @@
+"""add listing liveness flag
+
+Revision ID: 9e4c7a13b8f2
+Revises: 7d2b6e90c1a5
+Create Date: 2025-05-26 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4c7a13b8f2'
+down_revision: Union[str, None] = '7d2b6e90c1a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('listings', sa.Column('is_live', sa.Boolean(), server_default='true', nullable=False))
+    op.add_column('listings', sa.Column('liveness_checked_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_listings_is_live', 'listings', ['is_live'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listings_is_live', 'listings')
+    op.drop_column('listings', 'liveness_checked_at')
+    op.drop_column('listings', 'is_live')
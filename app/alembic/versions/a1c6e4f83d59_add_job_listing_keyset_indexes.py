@@ -0,0 +1,28 @@
+"""add job listing keyset indexes
+
+Revision ID: a1c6e4f83d59
+Revises: f3b8d6a02c47
+Create Date: 2025-06-05 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c6e4f83d59'
+down_revision: Union[str, None] = 'f3b8d6a02c47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_job_listing_scores_job_score', 'job_listing_scores', ['job_id', 'score', 'listing_id'])
+    op.create_index('ix_job_listing_scores_job_created', 'job_listing_scores', ['job_id', 'created_at', 'listing_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_job_listing_scores_job_created', 'job_listing_scores')
+    op.drop_index('ix_job_listing_scores_job_score', 'job_listing_scores')
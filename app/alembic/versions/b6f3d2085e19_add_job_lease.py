@@ -0,0 +1,26 @@
+"""add dispatcher lease to jobs
+
+Revision ID: b6f3d2085e19
+Revises: 9e4c7a13b8f2
+Create Date: 2025-05-28 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6f3d2085e19'
+down_revision: Union[str, None] = '9e4c7a13b8f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'lease_expires_at')
@@ -0,0 +1,53 @@
+"""add job summaries
+
+Revision ID: b7d2f5a18e64
+Revises: a1c6e4f83d59
+Create Date: 2025-06-06 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2f5a18e64'
+down_revision: Union[str, None] = 'a1c6e4f83d59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'job_summaries',
+        sa.Column('job_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('jobs.id'), primary_key=True),
+        sa.Column('listing_count', sa.Integer(), nullable=False),
+        sa.Column('evaluated_count', sa.Integer(), nullable=False),
+        sa.Column('top_score', sa.Float(), nullable=True),
+        sa.Column('top_listing_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('cover_image_url', sa.String(), nullable=True),
+        sa.Column('last_new_listing_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+    )
+
+    # Backfill from the same aggregates the dashboard used to compute per request
+    op.execute("""
+        INSERT INTO job_summaries (job_id, listing_count, evaluated_count, top_score, top_listing_id, cover_image_url, last_new_listing_at)
+        SELECT s.job_id,
+               COUNT(*),
+               COUNT(*) FILTER (WHERE s.score <> 0),
+               MAX(s.score),
+               (ARRAY_AGG(s.listing_id ORDER BY s.score DESC))[1],
+               (ARRAY_AGG(NULLIF(l.image_urls, '')::json ->> 0 ORDER BY s.score DESC))[1],
+               MAX(s.created_at)
+        FROM job_listing_scores s
+        JOIN listings l ON l.id = s.listing_id
+        WHERE l.is_live
+        GROUP BY s.job_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('job_summaries')
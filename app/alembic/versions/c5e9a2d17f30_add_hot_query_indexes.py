@@ -0,0 +1,63 @@
+"""add hot query indexes
+
+Revision ID: c5e9a2d17f30
+Revises: b7d2f5a18e64
+Create Date: 2025-06-07 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e9a2d17f30'
+down_revision: Union[str, None] = 'b7d2f5a18e64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently so scrapes and evaluations keep writing to these tables during the migration
+    with op.get_context().autocommit_block():
+        # Dashboard: jobs a user owns, most recently updated first
+        op.create_index('ix_jobs_user_updated', 'jobs', ['user_id', 'updated_at'], postgresql_concurrently=True)
+        # The primary key leads with job_id, so lookups by listing need their own index
+        op.create_index('ix_job_listing_scores_listing_id', 'job_listing_scores', ['listing_id'], postgresql_concurrently=True)
+        # Scores still waiting for an evaluation are a small slice of the table
+        op.create_index(
+            'ix_job_listing_scores_pending', 'job_listing_scores', ['job_id'],
+            postgresql_where=sa.text('score = 0 OR needs_reevaluation'), postgresql_concurrently=True
+        )
+        # Liveness sweep: live listings, least recently checked first
+        op.create_index(
+            'ix_listings_liveness_due', 'listings', [sa.text('liveness_checked_at NULLS FIRST')],
+            postgresql_where=sa.text('is_live'), postgresql_concurrently=True
+        )
+        op.create_index('ix_listings_last_scraped_at', 'listings', ['last_scraped_at'], postgresql_concurrently=True)
+        # Code verification: the newest unused code for an email
+        op.create_index(
+            'ix_verification_codes_unused', 'verification_codes', ['email', 'code', 'created_at'],
+            postgresql_where=sa.text('NOT used'), postgresql_concurrently=True
+        )
+        # A job's run history, newest first, replaces the two single-column indexes
+        op.create_index('ix_job_runs_job_started', 'job_runs', ['job_id', 'started_at'], postgresql_concurrently=True)
+        op.drop_index('ix_job_runs_job_id', 'job_runs', postgresql_concurrently=True)
+        op.drop_index('ix_job_runs_started_at', 'job_runs', postgresql_concurrently=True)
+        # Covered by the leading column of the keyset indexes
+        op.drop_index('idx_job_listing_scores_job_id', 'job_listing_scores', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('idx_job_listing_scores_job_id', 'job_listing_scores', ['job_id'], postgresql_concurrently=True)
+        op.create_index('ix_job_runs_started_at', 'job_runs', ['started_at'], postgresql_concurrently=True)
+        op.create_index('ix_job_runs_job_id', 'job_runs', ['job_id'], postgresql_concurrently=True)
+        op.drop_index('ix_job_runs_job_started', 'job_runs', postgresql_concurrently=True)
+        op.drop_index('ix_verification_codes_unused', 'verification_codes', postgresql_concurrently=True)
+        op.drop_index('ix_listings_last_scraped_at', 'listings', postgresql_concurrently=True)
+        op.drop_index('ix_listings_liveness_due', 'listings', postgresql_concurrently=True)
+        op.drop_index('ix_job_listing_scores_pending', 'job_listing_scores', postgresql_concurrently=True)
+        op.drop_index('ix_job_listing_scores_listing_id', 'job_listing_scores', postgresql_concurrently=True)
+        op.drop_index('ix_jobs_user_updated', 'jobs', postgresql_concurrently=True)
@@ -0,0 +1,38 @@
+"""store image urls as jsonb
+
+Revision ID: d2f7b4e06a93
+Revises: c5e9a2d17f30
+Create Date: 2025-06-07 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f7b4e06a93'
+down_revision: Union[str, None] = 'c5e9a2d17f30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        'listings', 'image_urls',
+        type_=postgresql.JSONB(),
+        postgresql_using="NULLIF(image_urls, '')::jsonb"
+    )
+    op.add_column('listings', sa.Column('cover_image_url', sa.String(), nullable=True))
+    op.execute("UPDATE listings SET cover_image_url = image_urls ->> 0 WHERE jsonb_typeof(image_urls) = 'array'")
+
+
+def downgrade() -> None:
+    op.drop_column('listings', 'cover_image_url')
+    op.alter_column(
+        'listings', 'image_urls',
+        type_=sa.String(),
+        postgresql_using="image_urls::text"
+    )
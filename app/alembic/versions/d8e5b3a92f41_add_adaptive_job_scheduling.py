@@ -0,0 +1,35 @@
+"""add adaptive job scheduling columns
+
+Revision ID: d8e5b3a92f41
+Revises: c4a9f1e7d602
+Create Date: 2025-06-01 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e5b3a92f41'
+down_revision: Union[str, None] = 'c4a9f1e7d602'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('next_run_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('jobs', sa.Column('last_viewed_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('jobs', sa.Column('new_listing_rate', sa.Float(), nullable=True))
+
+    # Existing jobs keep their fixed daily cadence until their first adaptive run
+    op.execute("UPDATE jobs SET next_run_at = COALESCE(updated_at, created_at) + INTERVAL '24 hours'")
+    op.create_index('ix_jobs_next_run_at', 'jobs', ['next_run_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_next_run_at', 'jobs')
+    op.drop_column('jobs', 'new_listing_rate')
+    op.drop_column('jobs', 'last_viewed_at')
+    op.drop_column('jobs', 'next_run_at')
@@ -0,0 +1,26 @@
+"""add user scheduling weight
+
+Revision ID: e2a7c5f913b8
+Revises: d8e5b3a92f41
+Create Date: 2025-06-03 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c5f913b8'
+down_revision: Union[str, None] = 'd8e5b3a92f41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('scheduling_weight', sa.Float(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'scheduling_weight')
@@ -0,0 +1,84 @@
+"""move bulky text to side tables
+
+Revision ID: e8c3a7f52b16
+Revises: d2f7b4e06a93
+Create Date: 2025-06-08 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c3a7f52b16'
+down_revision: Union[str, None] = 'd2f7b4e06a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRACE_COLUMNS = ('trace', 'heuristic_trace', 'aesthetic_trace')
+
+
+def _compress_with_lz4(table: str, columns: Sequence[str]) -> None:
+    # Postgres 14+ built with lz4 compresses TOASTed text faster than the default pglz; elsewhere keep the default
+    for column in columns:
+        op.execute(f"""
+            DO $$ BEGIN
+                EXECUTE 'ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION lz4';
+            EXCEPTION WHEN others THEN
+                RAISE NOTICE 'Keeping default compression for {table}.{column}';
+            END $$
+        """)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'listing_details',
+        sa.Column('listing_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('listings.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('description', sa.Text(), nullable=True),
+    )
+    _compress_with_lz4('listing_details', ['description'])
+    op.execute("""
+        INSERT INTO listing_details (listing_id, description)
+        SELECT id, description FROM listings WHERE description IS NOT NULL
+    """)
+    op.drop_column('listings', 'description')
+
+    op.create_table(
+        'job_listing_traces',
+        sa.Column('job_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('listing_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        *[sa.Column(column, sa.Text(), nullable=True) for column in TRACE_COLUMNS],
+        sa.ForeignKeyConstraint(
+            ['job_id', 'listing_id'], ['job_listing_scores.job_id', 'job_listing_scores.listing_id'], ondelete='CASCADE'
+        ),
+    )
+    _compress_with_lz4('job_listing_traces', TRACE_COLUMNS)
+    op.execute("""
+        INSERT INTO job_listing_traces (job_id, listing_id, trace, heuristic_trace, aesthetic_trace)
+        SELECT job_id, listing_id, trace, heuristic_trace, aesthetic_trace FROM job_listing_scores
+        WHERE trace <> '' OR heuristic_trace <> '' OR aesthetic_trace <> ''
+    """)
+    for column in TRACE_COLUMNS:
+        op.drop_column('job_listing_scores', column)
+
+
+def downgrade() -> None:
+    for column in TRACE_COLUMNS:
+        op.add_column('job_listing_scores', sa.Column(column, sa.String(), nullable=True))
+    op.execute("""
+        UPDATE job_listing_scores s
+        SET trace = t.trace, heuristic_trace = t.heuristic_trace, aesthetic_trace = t.aesthetic_trace
+        FROM job_listing_traces t
+        WHERE t.job_id = s.job_id AND t.listing_id = s.listing_id
+    """)
+    op.drop_table('job_listing_traces')
+
+    op.add_column('listings', sa.Column('description', sa.String(), nullable=True))
+    op.execute("""
+        UPDATE listings l SET description = d.description
+        FROM listing_details d WHERE d.listing_id = l.id
+    """)
+    op.drop_table('listing_details')
@@ -0,0 +1,51 @@
+"""add job runs
+
+Revision ID: f3b8d6a02c47
+Revises: e2a7c5f913b8
+Create Date: 2025-06-04 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d6a02c47'
+down_revision: Union[str, None] = 'e2a7c5f913b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'job_runs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('job_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('jobs.id'), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('evaluated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('pages_loaded', sa.Integer(), nullable=False),
+        sa.Column('listings_new', sa.Integer(), nullable=False),
+        sa.Column('listings_known', sa.Integer(), nullable=False),
+        sa.Column('listings_rejected', sa.Integer(), nullable=False),
+        sa.Column('listings_linked', sa.Integer(), nullable=False),
+        sa.Column('evaluations_done', sa.Integer(), nullable=False),
+        sa.Column('evaluations_failed', sa.Integer(), nullable=False),
+        sa.Column('evaluations_cached', sa.Integer(), nullable=False),
+        sa.Column('tokens_used', sa.Integer(), nullable=False),
+        sa.Column('scrape_seconds', sa.Float(), nullable=False),
+        sa.Column('db_write_seconds', sa.Float(), nullable=False),
+        sa.Column('evaluation_seconds', sa.Float(), nullable=False),
+    )
+    op.create_index('ix_job_runs_job_id', 'job_runs', ['job_id'])
+    op.create_index('ix_job_runs_started_at', 'job_runs', ['started_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_job_runs_started_at', 'job_runs')
+    op.drop_index('ix_job_runs_job_id', 'job_runs')
+    op.drop_table('job_runs')
@@ -0,0 +1,38 @@
+"""rebuild image fingerprint bands
+
+Revision ID: f9a4d1c6b283
+Revises: e8c3a7f52b16
+Create Date: 2025-06-10 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f9a4d1c6b283'
+down_revision: Union[str, None] = 'e8c3a7f52b16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _rebuild_image_bands(band_count: int) -> None:
+    # Masking after the arithmetic shift gives the same bits as splitting the unsigned hash in app.core.similarity
+    band_bits = 64 // band_count
+    op.execute("DELETE FROM listing_fingerprint_bands WHERE kind = 'image'")
+    op.execute(f"""
+        INSERT INTO listing_fingerprint_bands (kind, band, value, listing_id)
+        SELECT 'image', band, ((image_dhash >> (band * {band_bits})) & {(1 << band_bits) - 1})::int, id
+        FROM listings, generate_series(0, {band_count - 1}) AS band
+        WHERE image_dhash IS NOT NULL
+    """)
+
+
+def upgrade() -> None:
+    # Eight 8-bit bands, so photos within IMAGE_MAX_DISTANCE bits always share a band
+    _rebuild_image_bands(8)
+
+
+def downgrade() -> None:
+    _rebuild_image_bands(4)
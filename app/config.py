@@ -21,6 +21,52 @@ COMMON_PARENT_DOMAIN = os.getenv("COMMON_PARENT_DOMAIN", None)
 
 NO_IMAGE_URL = 'https://i.kym-cdn.com/entries/icons/original/000/049/021/duck_smoking_gif.jpg'
 
+# Known listings are rescraped for edits (price drops, new photos) once they are this old
+LISTING_RESCRAPE_INTERVAL_HOURS = int(os.getenv("LISTING_RESCRAPE_INTERVAL_HOURS", "72"))
+
+# Stale-listing sweeper: how often each live listing is checked, and how many per sweep
+LIVENESS_CHECK_INTERVAL_HOURS = int(os.getenv("LIVENESS_CHECK_INTERVAL_HOURS", "24"))
+LIVENESS_BATCH_SIZE = int(os.getenv("LIVENESS_BATCH_SIZE", "200"))
+LIVENESS_CONCURRENCY = int(os.getenv("LIVENESS_CONCURRENCY", "10"))
+
+# Listings fingerprinted per backfill task; each task queues the next batch until none are left
+FINGERPRINT_BACKFILL_BATCH_SIZE = int(os.getenv("FINGERPRINT_BACKFILL_BATCH_SIZE", "100"))
+
+# Job dispatcher: jobs claimed per tick, and how long a claim holds before another dispatcher may retake it.
+# The lease outlives the Celery task time limit so a running job is never dispatched twice.
+JOB_REFRESH_INTERVAL_HOURS = 24
+DISPATCH_BATCH_SIZE = int(os.getenv("DISPATCH_BATCH_SIZE", "20"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", str(45 * 60)))
+# Checkpoints older than this belong to an abandoned run and are discarded instead of resumed
+CHECKPOINT_MAX_AGE_HOURS = int(os.getenv("CHECKPOINT_MAX_AGE_HOURS", "6"))
+
+# Fair-share scheduling: per-user concurrency caps and daily budgets, and the total evaluation
+# batches allowed on the queue at once (the rest wait in per-user backlogs)
+USER_MAX_CONCURRENT_SCRAPES = int(os.getenv("USER_MAX_CONCURRENT_SCRAPES", "1"))
+USER_MAX_CONCURRENT_EVALUATIONS = int(os.getenv("USER_MAX_CONCURRENT_EVALUATIONS", "2"))
+EVALUATION_MAX_IN_FLIGHT = int(os.getenv("EVALUATION_MAX_IN_FLIGHT", "16"))
+DAILY_TOKEN_BUDGET = int(os.getenv("DAILY_TOKEN_BUDGET", "2000000"))
+DAILY_PAGE_BUDGET = int(os.getenv("DAILY_PAGE_BUDGET", "2000"))
+
+# Port of the Prometheus exporter each Celery worker serves; the web app exposes /metrics itself
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "9100"))
+
+# Tracing: "otlp" exports to the collector at OTEL_EXPORTER_OTLP_ENDPOINT, "file" appends JSON lines to
+# TRACE_FILE_PATH, "none" disables it. Only this share of traces is recorded.
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")
+TRACE_FILE_PATH = os.getenv("TRACE_FILE_PATH", "traces.jsonl")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.05"))
+
+# Cached job endpoint responses are invalidated by version bumps on write; the TTL only bounds memory use
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "600"))
+
+# Job exports stream from a server-side cursor this many rows at a time; each batch is one Parquet row group
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# API responses smaller than this go out uncompressed; brotli quality trades CPU for size (0-11)
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
 class QueryConfig(BaseModel):
     """Configuration for housing search query parameters. All fields are optional."""
     min_bedrooms: int | None = 4
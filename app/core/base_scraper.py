@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import AsyncGenerator, List, Optional, Union
+from typing import AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Union
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, WebDriverException
@@ -9,9 +9,16 @@ import time
 from uuid import UUID
 from app.models.models import Listing, JobTemplate
 from app.config import SELENIUM_HOST
+from app.services.metrics import PAGE_LOAD_SECONDS
+from app.services.tracing import tracer
 import logging
 
 ScrapeOutput = Union[Listing, str]  # str represents listing_hash
+
+class PageBudgetExceeded(Exception):
+    """Raised when a scrape is not allowed to load any more pages"""
+    pass
+
 class DriverManager:
     _instance = None
     _driver = None
@@ -111,6 +118,15 @@ class ScrapingConfig:
         self.zipcode = zipcode
         self.search_radius_miles = search_radius_miles
         self.max_listings_to_scrape = max_listings_to_scrape
+    def search_key(self) -> str:
+        """Canonical key of the search this config runs; jobs with equal keys can share one scrape"""
+        location = (self.location or "").lower().strip()
+        zipcode = "".join(ch for ch in str(self.zipcode or "") if ch.isdigit())
+        return "|".join(str(part) for part in [
+            location, zipcode, self.search_radius_miles, self.min_price, self.max_price,
+            self.min_bedrooms, self.min_bathrooms, self.min_square_feet, self.max_listings_to_scrape
+        ])
+
     @classmethod
     def from_job_template(cls, template: JobTemplate) -> 'ScrapingConfig':
         """Create config from a job template"""
@@ -124,10 +140,54 @@ class ScrapingConfig:
             search_radius_miles=template.search_distance_miles
         )
 
+class ScrapeCheckpoint:
+    """Progress of a scrape, persisted so a retried or resumed run continues where it stopped"""
+    def __init__(
+        self,
+        pages_crawled: int = 0,
+        search_complete: bool = False,
+        visited_search_urls: Optional[List[str]] = None,
+        frontier: Optional[List[str]] = None,
+        processed_urls: Optional[List[str]] = None,
+        scraped_count: int = 0,
+        enqueued_listing_ids: Optional[Dict[str, List[str]]] = None
+    ):
+        self.pages_crawled = pages_crawled
+        self.search_complete = search_complete
+        self.visited_search_urls = set(visited_search_urls or [])
+        self.frontier = list(frontier or [])
+        self.processed_urls = set(processed_urls or [])
+        self.scraped_count = scraped_count
+        # Evaluation cursor: listings already handed off, per job ID
+        self.enqueued_listing_ids = {job_id: set(listing_ids) for job_id, listing_ids in (enqueued_listing_ids or {}).items()}
+
+    def to_dict(self) -> dict:
+        return {
+            'pages_crawled': self.pages_crawled,
+            'search_complete': self.search_complete,
+            'visited_search_urls': sorted(self.visited_search_urls),
+            'frontier': self.frontier,
+            'processed_urls': sorted(self.processed_urls),
+            'scraped_count': self.scraped_count,
+            'enqueued_listing_ids': {job_id: sorted(listing_ids) for job_id, listing_ids in self.enqueued_listing_ids.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'ScrapeCheckpoint':
+        return cls(**state)
+
 class BaseScraper(ABC):
     def __init__(self, config: ScrapingConfig):
         self._driver_manager = DriverManager.get_instance()
         self.config = config
+        self.checkpoint = ScrapeCheckpoint()
+        # Called whenever the checkpoint is at a safe point to persist
+        self.on_checkpoint: Optional[Callable[[ScrapeCheckpoint], Awaitable[None]]] = None
+        # Consulted before, and notified after, every page load
+        self.allow_page_load: Optional[Callable[[], bool]] = None
+        self.on_page_load: Optional[Callable[[str], None]] = None
+        # Listings scraped in this attempt that failed validation
+        self.rejected_count = 0
         self.logger = logging.getLogger(self.__class__.__name__)
         
         console_handler = logging.StreamHandler()
@@ -140,6 +200,25 @@ class BaseScraper(ABC):
     def driver(self):
         return self._driver_manager.get_driver()
 
+    def load_page(self, url: str):
+        """Navigate the driver to a URL. All page loads go through here so they can be budgeted."""
+        if self.allow_page_load and not self.allow_page_load():
+            raise PageBudgetExceeded(f"Page budget exhausted before loading {url}")
+        started = time.perf_counter()
+        with tracer.start_as_current_span("selenium.page_load", attributes={"url": url}):
+            try:
+                self.driver.get(url)
+            except Exception:
+                PAGE_LOAD_SECONDS.labels('error').observe(time.perf_counter() - started)
+                raise
+        PAGE_LOAD_SECONDS.labels('ok').observe(time.perf_counter() - started)
+        if self.on_page_load:
+            self.on_page_load(url)
+
+    async def save_checkpoint(self):
+        if self.on_checkpoint:
+            await self.on_checkpoint(self.checkpoint)
+
     @abstractmethod
     def get_search_url(self) -> str:
         """Generate the initial search URL based on config"""
@@ -165,7 +244,7 @@ class BaseScraper(ABC):
         try:
             search_url = self.get_search_url()
             try:
-                self.driver.get(search_url)
+                self.load_page(search_url)
             except (TimeoutException, WebDriverException) as e:
                 self.logger.error(f"Failed to connect to Selenium or load page: {str(e)}")
                 self._driver_manager.quit_driver()
@@ -176,6 +255,8 @@ class BaseScraper(ABC):
                     listing = self.scrape_listing(listing_url)
                     if listing and self.validate_listing(listing):
                         yield listing
+                    elif listing:
+                        self.rejected_count += 1
                 except Exception as e:
                     self.logger.error(f"Error scraping listing {listing_url}: {str(e)}")
                     continue
@@ -9,8 +9,9 @@ import re
 import asyncio
 from typing import AsyncGenerator, List, Optional
 from app.models.models import Listing
-from app.core.base_scraper import BaseScraper, ScrapingConfig, ScrapeOutput
-from app.db.database import _listing_hash, get_stored_listing_hashes
+from app.core.base_scraper import BaseScraper, PageBudgetExceeded, ScrapingConfig, ScrapeOutput
+from app.db.database import _listing_hash, get_stale_listing_hashes, get_stored_listing_hashes
+from app.core.similarity import description_simhash, image_dhash
 
 # Regex to allow only alphanumeric characters for Craigslist location subdomains
 VALID_LOCATION_REGEX = re.compile(r"^[a-zA-Z0-9]+$")
@@ -21,6 +22,7 @@ class CraigslistScraper(BaseScraper):
         self.base_url = "https://craigslist.org/search/apa"
         self.sleep_time = 0.2
         self.existing_hashes = set()
+        self.stale_hashes = set()
         self.max_listings_to_scrape = config.max_listings_to_scrape  # Store the limit
 
     def __enter__(self):
@@ -65,14 +67,19 @@ class CraigslistScraper(BaseScraper):
         return url
 
     async def get_listing_urls(self) -> List[str]:
-        page = 0
-        visited_urls = set()
-        all_links = []
+        checkpoint = self.checkpoint
+        if checkpoint.search_complete:
+            print(f"[DEBUG] Resuming with {len(checkpoint.frontier)} links from checkpointed search")
+            return checkpoint.frontier
+
+        page = checkpoint.pages_crawled
+        visited_urls = checkpoint.visited_search_urls
+        all_links = checkpoint.frontier
         
         while True:
             current_url = f"{self.get_search_url()}#search=1~gallery~{page}~0"
             print(f"[DEBUG] Navigating to page {page} at URL: {current_url}")
-            self.driver.get(current_url)
+            self.load_page(current_url)
             await asyncio.sleep(self.sleep_time)
             
             if self.driver.current_url in visited_urls:
@@ -97,6 +104,8 @@ class CraigslistScraper(BaseScraper):
                 all_links.extend(links)
                     
                 page += 1
+                checkpoint.pages_crawled = page
+                await self.save_checkpoint()
                 print(f"[DEBUG] Moving to page {page}")
                 await asyncio.sleep(self.sleep_time)
                 
@@ -105,6 +114,8 @@ class CraigslistScraper(BaseScraper):
                 break
         
         print(f"[DEBUG] Total links found: {len(all_links)}")
+        checkpoint.search_complete = True
+        await self.save_checkpoint()
         return all_links
     
     @staticmethod
@@ -207,7 +218,7 @@ class CraigslistScraper(BaseScraper):
     async def scrape_listing(self, url: str) -> Optional[Listing]:
         """Extract listing information from a Craigslist posting."""
         try:
-            self.driver.get(url)
+            self.load_page(url)
             
             # Wait for title element to load
             WebDriverWait(self.driver, 10).until(
@@ -242,6 +253,8 @@ class CraigslistScraper(BaseScraper):
                     
             bedrooms, bathrooms, square_footage = self._extract_housing_details(self.driver)
             image_urls = self._extract_image_urls(self.driver)
+            # Hashing downloads the cover photo, so keep it off the event loop
+            cover_dhash = await asyncio.to_thread(image_dhash, image_urls[0]) if image_urls else None
 
             await asyncio.sleep(self.sleep_time)  # Add small delay between requests
 
@@ -257,9 +270,14 @@ class CraigslistScraper(BaseScraper):
                 bedrooms=bedrooms, 
                 bathrooms=bathrooms,
                 square_footage=square_footage,
-                image_urls=json.dumps(image_urls)
+                image_urls=image_urls,
+                cover_image_url=image_urls[0] if image_urls else None,
+                description_simhash=description_simhash(description),
+                image_dhash=cover_dhash
             )
             
+        except PageBudgetExceeded:
+            raise
         except Exception as e:
             self.logger.error(f"Error scraping listing: {str(e)}")
             return None
@@ -278,12 +296,13 @@ class CraigslistScraper(BaseScraper):
     async def load_existing_hashes(self):
         """Load existing listing hashes from database"""
         self.existing_hashes = get_stored_listing_hashes()
-        print(f"[DEBUG] Loaded {len(self.existing_hashes)} existing listing hashes")
+        self.stale_hashes = get_stale_listing_hashes()
+        print(f"[DEBUG] Loaded {len(self.existing_hashes)} existing listing hashes, {len(self.stale_hashes)} due for rescrape")
 
     async def scrape(self) -> AsyncGenerator[ScrapeOutput, None]:
         """Main scraping method that yields either new listings or existing listing hashes."""
         print(f"[DEBUG] In the craiglist scraping loop for the task {self.config.template_id}")
-        scraped_count = 0 # Counter for scraped items
+        checkpoint = self.checkpoint
         try:
             self.logger.info(f"Starting scraping process. Limit: {self.max_listings_to_scrape}")
             # Load existing hashes before starting
@@ -292,15 +311,20 @@ class CraigslistScraper(BaseScraper):
             print(f"[DEBUG] Found {len(urls)} potential listings")
             for url in urls:
                 # Check scrape limit
-                if self.max_listings_to_scrape is not None and scraped_count >= self.max_listings_to_scrape:
+                if self.max_listings_to_scrape is not None and checkpoint.scraped_count >= self.max_listings_to_scrape:
                     self.logger.info(f"Reached scrape limit of {self.max_listings_to_scrape}. Stopping.")
                     break 
+
+                if url in checkpoint.processed_urls:
+                    continue
+                # Marked before yielding; callers persist the checkpoint only once yielded output is saved
+                checkpoint.processed_urls.add(url)
                 
                 # Check if listing already exists before scraping
                 post_id = url.split("/")[-1].split(".")[0]
                 listing_hash = _listing_hash(post_id)
                 
-                if listing_hash in self.existing_hashes:
+                if listing_hash in self.existing_hashes and listing_hash not in self.stale_hashes:
                     self.logger.info(f"Found existing listing (hash): {url}")
                     yield listing_hash
                     continue
@@ -312,15 +336,19 @@ class CraigslistScraper(BaseScraper):
                 
                 if listing:
                     self.existing_hashes.add(listing.hash) # Add hash after confirming scrape
+                    self.stale_hashes.discard(listing.hash)
                     self.logger.info(f"Successfully scraped listing: {listing.title}")
                     if self.validate_listing(listing):
                         self.logger.info(f"Listing passed validation: {listing.title}")
+                        checkpoint.scraped_count += 1 # Increment count only for yielded new listings
                         yield listing
-                        scraped_count += 1 # Increment count only for yielded new listings
                     else:
                         self.logger.info(f"Listing failed validation: {listing.title}")
+                        self.rejected_count += 1
                 else:
                     self.logger.warning(f"Failed to scrape listing from URL: {url}")
+        except PageBudgetExceeded as e:
+            self.logger.warning(f"Stopping scrape: {str(e)}")
         except Exception as e:
             self.logger.error(f"Error in scrape method: {str(e)}")
             raise
\ No newline at end of file
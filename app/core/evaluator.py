@@ -1,10 +1,13 @@
 import base64
+import time
 
 import httpx
 from app.config import GPT_MODEL, CLAUDE_MODEL, CRITERIA, USE_CLAUDE, QUERY_CONFIG
 from app.db.database import get_unevaluated_listings
 from app.models.models import Listing
-import json
+from app.services.metrics import LLM_ERRORS, LLM_REQUEST_SECONDS, LLM_TOKENS
+from app.services.tracing import traced
+from opentelemetry import trace
 from dotenv import load_dotenv
 from pydantic import BaseModel
 
@@ -84,12 +87,13 @@ def _format_image_contents_openai(image_urls: list[str], detail: str = "auto") -
         })
     return formatted_contents
 
-def _evaluate_with_gpt4v(listing: Listing, criteria: str) -> tuple[int, str]:
-    """Evaluate listing using GPT-4V."""
+@traced("llm.openai")
+def _evaluate_with_gpt4v(listing: Listing, criteria: str) -> tuple[int, str, int]:
+    """Evaluate listing using GPT-4V. Returns score, trace and tokens used."""
     try:
-        image_urls = json.loads(listing.image_urls)
+        image_urls = listing.image_urls or []
         if not image_urls:
-            return 0, "No images available"
+            return 0, "No images available", 0
 
         formatted_contents = _format_image_contents_openai(image_urls)
 
@@ -100,6 +104,7 @@ def _evaluate_with_gpt4v(listing: Listing, criteria: str) -> tuple[int, str]:
             listing_description=listing.description
         )
 
+        started = time.perf_counter()
         completions = OPENAI_CLIENT.beta.chat.completions.parse(
             model=GPT_MODEL,
             messages= [
@@ -115,24 +120,33 @@ def _evaluate_with_gpt4v(listing: Listing, criteria: str) -> tuple[int, str]:
             response_format=ResponseSchema
         )
 
+        LLM_REQUEST_SECONDS.labels(GPT_MODEL).observe(time.perf_counter() - started)
+
         response = completions.choices[0].message.parsed
         print(response)
 
-        return response.score, response.reasoning_trace
+        tokens_used = completions.usage.total_tokens if completions.usage else 0
+        LLM_TOKENS.labels(GPT_MODEL).inc(tokens_used)
+        trace.get_current_span().set_attributes({"llm.model": GPT_MODEL, "llm.tokens": tokens_used})
+        return response.score, response.reasoning_trace, tokens_used
 
     except Exception as e:
-        return 0, f"Error evaluating with GPT-4V: {str(e)}"
+        LLM_ERRORS.labels(GPT_MODEL).inc()
+        trace.get_current_span().record_exception(e)
+        return 0, f"Error evaluating with GPT-4V: {str(e)}", 0
 
-def _evaluate_with_claude(listing: Listing, criteria: str) -> tuple[int, str]:
-    """Evaluate listing using Claude 3.5."""
+@traced("llm.anthropic")
+def _evaluate_with_claude(listing: Listing, criteria: str) -> tuple[int, str, int]:
+    """Evaluate listing using Claude 3.5. Returns score, trace and tokens used."""
     try:
-        image_urls = json.loads(listing.image_urls)
+        image_urls = listing.image_urls or []
         if not image_urls:
-            return 0, "No images available"
+            return 0, "No images available", 0
 
         image_contents = _get_image_contents(image_urls)
         formatted_contents = _format_image_contents_anthropic(image_contents)
 
+        started = time.perf_counter()
         response = ANTHROPIC_CLIENT.messages.create(
             model=CLAUDE_MODEL,
             max_tokens=4096,
@@ -147,67 +161,84 @@ def _evaluate_with_claude(listing: Listing, criteria: str) -> tuple[int, str]:
             }]
         )
 
+        LLM_REQUEST_SECONDS.labels(CLAUDE_MODEL).observe(time.perf_counter() - started)
+
+        tokens_used = response.usage.input_tokens + response.usage.output_tokens
+        LLM_TOKENS.labels(CLAUDE_MODEL).inc(tokens_used)
+        trace.get_current_span().set_attributes({"llm.model": CLAUDE_MODEL, "llm.tokens": tokens_used})
         response_text = response.content[0].text
         response = ResponseSchema.model_validate_json(response_text)
-        return response.score, response.reasoning_trace
+        return response.score, response.reasoning_trace, tokens_used
 
     except Exception as e:
-        return 0, f"Error evaluating with Claude: {str(e)}"
+        LLM_ERRORS.labels(CLAUDE_MODEL).inc()
+        trace.get_current_span().record_exception(e)
+        return 0, f"Error evaluating with Claude: {str(e)}", 0
 
-def evaluate_listing_aesthetics(listing: Listing) -> tuple[int, str]:
-    """Evaluate listing aesthetics using configured model."""
+def evaluate_listing_aesthetics(listing: Listing) -> tuple[int, str, int]:
+    """Evaluate listing aesthetics using configured model. Returns score, trace and tokens used."""
     print(f"\033[31mEvaluating aesthetics for {listing.title}\033[0m")
     if CLAUDE_MODEL and USE_CLAUDE:
         return _evaluate_with_claude(listing, CRITERIA)
     elif GPT_MODEL:
         return _evaluate_with_gpt4v(listing, CRITERIA)
     else:
-        return 0, "No evaluation model configured"
+        return 0, "No evaluation model configured", 0
 
 # something to experiment with later, right now we prefilter with the craiglist query.
 # this would allow us to explicitly note "better than" realities in the main lisiting (price/sqft, extra rooms, etc.)
-def evaluate_listing_hueristics(listing: Listing) -> tuple[int, str]:
-    """Evaluate a single listing and return score and trace."""
-    score = 0
+def evaluate_listing_hueristic_components(listing: Listing) -> tuple[dict[str, float], str]:
+    """Evaluate a single listing and return per-heuristic scores and trace."""
+    components = {
+        'price_score': 0,
+        'size_score': 0,
+        'bedrooms_score': 0,
+        'bathrooms_score': 0
+    }
     trace = []
     print(f"\033[31mEvaluating heursitics for {listing.title}\033[0m")
     # Price evaluation
     if QUERY_CONFIG.target_price_bedroom:
         if listing.price < QUERY_CONFIG.target_price_bedroom:
-            score += 10
+            components['price_score'] = 10
             trace.append(f"Good price under ${QUERY_CONFIG.target_price_bedroom}")
         elif listing.price < QUERY_CONFIG.target_price_bedroom * PRICE_COST_BOUND:
-            score += 5
+            components['price_score'] = 5
             trace.append(f"Moderate price under ${QUERY_CONFIG.target_price_bedroom * PRICE_COST_BOUND}")
         
     # Square footage evaluation
     if QUERY_CONFIG.min_square_feet:
         if listing.square_footage > QUERY_CONFIG.min_square_feet * PRICE_COST_BOUND:
-            score += 10
+            components['size_score'] = 10
             trace.append(f"Good size at {listing.square_footage}sqft")
         elif listing.square_footage > QUERY_CONFIG.min_square_feet:
-            score += 5
+            components['size_score'] = 5
             trace.append(f"Moderate size at {listing.square_footage}sqft")
         
     # Bedrooms evaluation
     if QUERY_CONFIG.min_bedrooms:
         if listing.bedrooms >= QUERY_CONFIG.min_bedrooms:
-            score += 5 + (listing.bedrooms - QUERY_CONFIG.min_bedrooms) * BEDROOM_PREFERENCE_MULTIPLIER
+            components['bedrooms_score'] = 5 + (listing.bedrooms - QUERY_CONFIG.min_bedrooms) * BEDROOM_PREFERENCE_MULTIPLIER
             trace.append(f"Good number of bedrooms: {listing.bedrooms}")
         elif listing.bedrooms == QUERY_CONFIG.min_bedrooms:
-            score += 5
+            components['bedrooms_score'] = 5
             trace.append(f"Moderate number of bedrooms: {listing.bedrooms}")
         
     # Bathrooms evaluation
     if QUERY_CONFIG.min_bathrooms:
         if listing.bathrooms >= QUERY_CONFIG.min_bathrooms:
-            score += 5 + (listing.bathrooms - QUERY_CONFIG.min_bathrooms) * BATHROOM_PREFERENCE_MULTIPLIER
+            components['bathrooms_score'] = 5 + (listing.bathrooms - QUERY_CONFIG.min_bathrooms) * BATHROOM_PREFERENCE_MULTIPLIER
             trace.append(f"Good number of bathrooms: {listing.bathrooms}")
         elif listing.bathrooms == QUERY_CONFIG.min_bathrooms:
-            score += 5
+            components['bathrooms_score'] = 5
             trace.append(f"Moderate number of bathrooms: {listing.bathrooms}")
 
-    return score, " | ".join(trace)
+    return components, " | ".join(trace)
+
+def evaluate_listing_hueristics(listing: Listing) -> tuple[int, str]:
+    """Evaluate a single listing and return score and trace."""
+    components, trace = evaluate_listing_hueristic_components(listing)
+    return sum(components.values()), trace
 
 def evaluate_unevaluated_listings():
     """Evaluate listings that haven't been scored yet."""
@@ -218,7 +249,7 @@ def evaluate_unevaluated_listings():
         current_batch = []
         for listing in unevaluated_listings:
             hueristic_score, hueristic_trace = evaluate_listing_hueristics(listing)
-            aesthetic_score, aesthetic_trace = evaluate_listing_aesthetics(listing)
+            aesthetic_score, aesthetic_trace, _ = evaluate_listing_aesthetics(listing)
             listing.score = hueristic_score + aesthetic_score
             listing.trace = hueristic_trace + " | " + aesthetic_trace
             current_batch.append(listing)
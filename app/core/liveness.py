@@ -0,0 +1,46 @@
+import asyncio
+from typing import Optional
+
+import httpx
+
+# Craigslist serves removed posts either as 404/410 or as a 200 page with one of these notices
+REMOVED_STATUS_CODES = {404, 410}
+REMOVED_PAGE_MARKERS = [
+    "This posting has been deleted by its author",
+    "This posting has expired",
+    "This posting has been flagged for removal",
+]
+# Removal notices sit near the top of the page, so there's no need to download the whole post
+MAX_BYTES_TO_READ = 64 * 1024
+REQUEST_TIMEOUT = 10
+
+async def check_listing_live(client: httpx.AsyncClient, url: str) -> Optional[bool]:
+    """Check whether a listing page is still up. Returns None when the check itself failed."""
+    try:
+        async with client.stream("GET", url, timeout=REQUEST_TIMEOUT, follow_redirects=True) as response:
+            if response.status_code in REMOVED_STATUS_CODES:
+                return False
+            if response.status_code != 200:
+                return None
+
+            content = b""
+            async for chunk in response.aiter_bytes():
+                content += chunk
+                if len(content) >= MAX_BYTES_TO_READ:
+                    break
+            page = content.decode("utf-8", errors="ignore")
+            return not any(marker in page for marker in REMOVED_PAGE_MARKERS)
+    except httpx.HTTPError as e:
+        print(f"Liveness check failed for {url}: {str(e)}")
+        return None
+
+async def check_listings_live(urls: dict, concurrency: int, client: httpx.AsyncClient) -> dict:
+    """Check many listings concurrently. Takes and returns dicts keyed by listing id."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _check(listing_id, url):
+        async with semaphore:
+            return listing_id, await check_listing_live(client, url)
+
+    results = await asyncio.gather(*[_check(listing_id, url) for listing_id, url in urls.items()])
+    return dict(results)
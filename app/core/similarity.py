@@ -0,0 +1,105 @@
+import hashlib
+import re
+from io import BytesIO
+from typing import Optional
+
+import httpx
+from PIL import Image
+
+HASH_BITS = 64
+SHINGLE_SIZE = 3
+
+# Hashes within these Hamming distances are considered the same post
+DESCRIPTION_MAX_DISTANCE = 3
+IMAGE_MAX_DISTANCE = 6
+# A reworded description still counts when the cover photo matches
+REWORDED_DESCRIPTION_MAX_DISTANCE = 16
+
+# Two hashes within N bits share at least one of N + 1 bands exactly, so each kind gets one band more than its
+# max distance. Reworded descriptions need no bands of their own: they only match alongside a matching photo,
+# which the image bands retrieve.
+DESCRIPTION_BAND_COUNT = 4  # 16-bit bands
+IMAGE_BAND_COUNT = 8  # 8-bit bands
+
+_MASK = (1 << HASH_BITS) - 1
+
+
+def _to_signed(value: int) -> int:
+    """Fold an unsigned 64-bit hash into the signed range so it fits a BIGINT column."""
+    return value - (1 << HASH_BITS) if value >= (1 << (HASH_BITS - 1)) else value
+
+
+def normalize_description(description: str) -> str:
+    """Lowercase and strip punctuation so cosmetic edits between reposts don't change the hash."""
+    text = re.sub(r"[^a-z0-9\s]", " ", (description or "").lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def description_simhash(description: str) -> Optional[int]:
+    """SimHash over word shingles of the normalized description."""
+    words = normalize_description(description).split()
+    if not words:
+        return None
+
+    shingles = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(max(len(words) - SHINGLE_SIZE + 1, 1))]
+    votes = [0] * HASH_BITS
+    for shingle in shingles:
+        shingle_hash = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for bit in range(HASH_BITS):
+            votes[bit] += 1 if shingle_hash >> bit & 1 else -1
+
+    value = sum(1 << bit for bit, vote in enumerate(votes) if vote > 0)
+    return _to_signed(value)
+
+
+def image_dhash(image_url: str) -> Optional[int]:
+    """Difference hash of an image: compares adjacent pixels of a 9x8 grayscale thumbnail."""
+    try:
+        response = httpx.get(image_url, timeout=10)
+        response.raise_for_status()
+        image = Image.open(BytesIO(response.content)).convert("L").resize((9, 8), Image.LANCZOS)
+    except Exception as e:
+        print(f"Failed to hash image {image_url}: {str(e)}")
+        return None
+
+    pixels = list(image.getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return _to_signed(value)
+
+
+def hash_bands(value: Optional[int], band_count: int) -> list[int]:
+    """Split a hash into bands; two hashes within band_count - 1 bits share at least one band exactly."""
+    if value is None:
+        return []
+    unsigned = value & _MASK
+    band_bits = HASH_BITS // band_count
+    return [(unsigned >> (band * band_bits)) & ((1 << band_bits) - 1) for band in range(band_count)]
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin((a ^ b) & _MASK).count("1")
+
+
+def is_near_duplicate(
+    description_hash: Optional[int],
+    image_hash: Optional[int],
+    other_description_hash: Optional[int],
+    other_image_hash: Optional[int]
+) -> bool:
+    """Two posts are the same unit if their descriptions match (and photos agree when both have one),
+    or if their cover photos match and the description was only reworded."""
+    if description_hash is None or other_description_hash is None:
+        return False
+    description_distance = hamming_distance(description_hash, other_description_hash)
+    if image_hash is None or other_image_hash is None:
+        return description_distance <= DESCRIPTION_MAX_DISTANCE
+
+    image_distance = hamming_distance(image_hash, other_image_hash)
+    if description_distance <= DESCRIPTION_MAX_DISTANCE:
+        return image_distance <= IMAGE_MAX_DISTANCE
+    return image_distance <= IMAGE_MAX_DISTANCE and description_distance <= REWORDED_DESCRIPTION_MAX_DISTANCE
@@ -1,16 +1,31 @@
 import hashlib
-from app.models.models import engine, Listing, Job, JobTemplate, JobListingScore, User, job_access
+from app.models.models import (
+    engine, Listing, ListingFingerprintBand, ListingHistory, Job, JobCheckpoint, JobRun, JobSummary, JobTemplate,
+    JobListingScore, User, job_access
+)
 from sqlalchemy.orm import sessionmaker, Session
-from app.config import DATABASE_URL, NO_IMAGE_URL
-from sqlalchemy import create_engine, select, func, or_
+from app.config import (
+    DATABASE_URL, NO_IMAGE_URL, LISTING_RESCRAPE_INTERVAL_HOURS, LIVENESS_CHECK_INTERVAL_HOURS,
+    JOB_REFRESH_INTERVAL_HOURS, JOB_LEASE_SECONDS, CHECKPOINT_MAX_AGE_HOURS, EXPORT_BATCH_SIZE
+)
+from sqlalchemy import String, case, cast, create_engine, delete, exists, literal, literal_column, select, func, or_, tuple_, union_all, update
+from sqlalchemy.dialects.postgresql import BIT, aggregate_order_by, array_agg, insert as pg_insert
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import selectinload, aliased, contains_eager
+from sqlalchemy.orm import selectinload, aliased, contains_eager, lazyload, load_only
 from contextlib import contextmanager, asynccontextmanager
-from typing import List, Dict, Optional
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
+import base64
 import json
+import time
 from uuid import UUID
 from sqlalchemy import and_
+from app.core.similarity import (
+    DESCRIPTION_BAND_COUNT, DESCRIPTION_MAX_DISTANCE, IMAGE_BAND_COUNT, IMAGE_MAX_DISTANCE, hash_bands, is_near_duplicate
+)
+from app.services.metrics import instrument_engine
+from app.services.tracing import traced
+from app.services.response_cache import bump_job_versions, bump_user_version
 
 # Sync SQLAlchemy engine for migrations and model creation
 engine = create_engine(DATABASE_URL, echo=True, pool_pre_ping=True, pool_recycle=1800)
@@ -22,6 +37,8 @@ async_engine = create_async_engine(
     pool_pre_ping=True,  # Detect closed connections and reconnect automatically
     pool_recycle=1800    # Recycle connections every 30 minutes to avoid idle-timeout disconnects
 )
+instrument_engine(engine, 'sync')
+instrument_engine(async_engine.sync_engine, 'async')
 AsyncSessionLocal = sessionmaker(
     async_engine, 
     class_=AsyncSession, 
@@ -46,9 +63,56 @@ async def get_async_db() -> AsyncSession:
         finally:
             await session.close()
 
+# Columns of job_listing_scores that can be re-weighted at query time
+SCORE_COMPONENT_COLUMNS = ['price_score', 'size_score', 'bedrooms_score', 'bathrooms_score', 'aesthetic_score']
+# Features a repost inherits from its canonical listing when the scrape couldn't extract them
+REPOST_FEATURE_COLUMNS = ['bedrooms', 'bathrooms', 'square_footage', 'location', 'neighborhood']
+# Columns of job_listing_traces, written through JobListingScore's proxies
+TRACE_COLUMNS = ['trace', 'heuristic_trace', 'aesthetic_trace']
+MAX_REPOST_CANDIDATES = 50
+JOB_VIEW_RECORD_INTERVAL_MINUTES = 5
+# Sort options for a job's listings: (sort key, descending). None means the ranked score. Every sort is
+# keyset-paginated on (key, listing ID); unknown values are coalesced so they sort last.
+LISTING_SORTS = {
+    'score': (None, True),
+    'price': (Listing.price, False),
+    'price_desc': (Listing.price, True),
+    'square_footage': (Listing.square_footage, True),
+    'newest': (JobListingScore.created_at, True),
+}
+# Server-side filters on a job's listings: parameter name -> (column, comparison)
+LISTING_FILTERS = {
+    'min_price': (Listing.price, '>='),
+    'max_price': (Listing.price, '<='),
+    'min_bedrooms': (Listing.bedrooms, '>='),
+    'min_bathrooms': (Listing.bathrooms, '>='),
+    'min_square_footage': (Listing.square_footage, '>='),
+    'min_score': (None, '>='),  # None means the ranked score, as in LISTING_SORTS
+}
+# Listing columns the job listings response is built from; fingerprints and image lists are never loaded
+JOB_LISTING_COLUMNS = [
+    Listing.id, Listing.title, Listing.cover_image_url, Listing.location, Listing.price,
+    Listing.bedrooms, Listing.bathrooms, Listing.square_footage, Listing.link
+]
+# Per-process cache of (user ID, job ID) -> (allowed, expiry). Sharing changes made in this process evict
+# their entry; other processes see them once the TTL runs out.
+JOB_ACCESS_CACHE_TTL_SECONDS = 30
+JOB_ACCESS_CACHE_MAX_ENTRIES = 10000
+_job_access_cache: Dict[Tuple[UUID, UUID], Tuple[bool, float]] = {}
+# Fields recorded in listing_history when they change on rescrape
+TRACKED_LISTING_FIELDS = ['price', 'title', 'description', 'image_urls', 'bedrooms', 'bathrooms', 'square_footage']
+
 def _listing_hash(text):
     return hashlib.md5(text.encode()).hexdigest()
 
+def _content_fingerprint(listing: Listing) -> str:
+    """Hash of every tracked field, so a rescrape with an unchanged fingerprint has nothing to record."""
+    return hashlib.md5(json.dumps([getattr(listing, field) for field in TRACKED_LISTING_FIELDS]).encode()).hexdigest()
+
+def _history_value(value) -> str:
+    return json.dumps(value) if isinstance(value, list) else str(value)
+
+@traced()
 def get_stored_listing_hashes():
     Session = sessionmaker(bind=engine)
     session = Session()
@@ -58,13 +122,63 @@ def get_stored_listing_hashes():
         session.close()
     
 
+def _fingerprint_bands(listing: Listing) -> list[tuple[str, int, int]]:
+    return (
+        [('description', band, value) for band, value in enumerate(hash_bands(listing.description_simhash, DESCRIPTION_BAND_COUNT))] +
+        [('image', band, value) for band, value in enumerate(hash_bands(listing.image_dhash, IMAGE_BAND_COUNT))]
+    )
+
+def _hamming_distance_sql(column, value: int):
+    """Number of differing bits between a BIGINT hash column and a hash."""
+    return func.length(func.replace(cast(cast(column.op('#')(value), BIT(64)), String), '0', ''))
+
+async def _replace_fingerprint_bands(session: AsyncSession, listing: Listing) -> None:
+    """Rewrite a listing's band rows from its current hashes."""
+    await session.execute(delete(ListingFingerprintBand).where(ListingFingerprintBand.listing_id == listing.id))
+    session.add_all([
+        ListingFingerprintBand(kind=kind, band=band, value=value, listing_id=listing.id)
+        for kind, band, value in _fingerprint_bands(listing)
+    ])
+
+@traced()
+async def find_canonical_listing(session: AsyncSession, listing: Listing) -> Optional[Listing]:
+    """Find an earlier post of the same unit through the fingerprint band index."""
+    bands = _fingerprint_bands(listing)
+    if not bands:
+        return None
+
+    # Every near-duplicate is within one of these distances, so dropping the rest first keeps
+    # band collisions from crowding the true match out of the candidate limit
+    close_enough = []
+    if listing.description_simhash is not None:
+        close_enough.append(_hamming_distance_sql(Listing.description_simhash, listing.description_simhash) <= DESCRIPTION_MAX_DISTANCE)
+    if listing.image_dhash is not None:
+        close_enough.append(_hamming_distance_sql(Listing.image_dhash, listing.image_dhash) <= IMAGE_MAX_DISTANCE)
+
+    result = await session.execute(
+        select(Listing)
+        .join(ListingFingerprintBand, ListingFingerprintBand.listing_id == Listing.id)
+        .where(tuple_(ListingFingerprintBand.kind, ListingFingerprintBand.band, ListingFingerprintBand.value).in_(bands))
+        .where(or_(*close_enough))
+        .distinct()
+        .order_by(Listing.created_at)
+        .limit(MAX_REPOST_CANDIDATES)
+    )
+    for candidate in result.scalars().all():
+        if listing.bedrooms and candidate.bedrooms and listing.bedrooms != candidate.bedrooms:
+            continue
+        if is_near_duplicate(listing.description_simhash, listing.image_dhash, candidate.description_simhash, candidate.image_dhash):
+            return candidate
+    return None
+
+@traced()
 async def save_new_listings_to_db(listings: list[Listing]) -> list[Listing]:
     saved_listings = []
     async with get_async_db() as session:
         columns = [
             'hash', 'title', 'bedrooms', 'bathrooms', 'square_footage',
             'post_id', 'description', 'price', 'location', 'neighborhood',
-            'image_urls', 'link'
+            'image_urls', 'cover_image_url', 'link', 'description_simhash', 'image_dhash'
         ]
 
         for listing in listings:
@@ -78,11 +192,22 @@ async def save_new_listings_to_db(listings: list[Listing]) -> list[Listing]:
                     column: getattr(listing, column)
                     for column in columns
                 }
+                listing_data['content_fingerprint'] = _content_fingerprint(listing)
+
+                canonical = await find_canonical_listing(session, listing)
+                if canonical:
+                    print(f"[DEBUG] Listing {listing.post_id} is a repost of {canonical.post_id}")
+                    listing_data['canonical_listing_id'] = canonical.canonical_listing_id or canonical.id
+                    for column in REPOST_FEATURE_COLUMNS:
+                        if not listing_data.get(column):
+                            listing_data[column] = getattr(canonical, column)
                 
                 new_listing = Listing(
                     **listing_data
                 )
                 session.add(new_listing)
+                await session.flush()
+                await _replace_fingerprint_bands(session, new_listing)
                 await session.commit()
                 await session.refresh(new_listing)
                 saved_listings.append(new_listing)
@@ -91,6 +216,170 @@ async def save_new_listings_to_db(listings: list[Listing]) -> list[Listing]:
     
     return saved_listings
 
+@traced()
+async def get_listings_missing_fingerprints(after_id: Optional[UUID], limit: int) -> List[Listing]:
+    """Listings without fingerprint bands, in ID order after `after_id`, with their descriptions."""
+    query = (
+        select(Listing)
+        .where(~exists().where(ListingFingerprintBand.listing_id == Listing.id))
+        .options(selectinload(Listing.details))
+        .order_by(Listing.id)
+        .limit(limit)
+    )
+    if after_id:
+        query = query.where(Listing.id > after_id)
+    async with get_async_db() as session:
+        result = await session.execute(query)
+        return list(result.scalars().all())
+
+@traced()
+async def save_listing_fingerprints(listing_id: UUID, description_simhash: Optional[int], image_dhash: Optional[int]) -> None:
+    """Store a listing's similarity hashes and index them for repost lookups."""
+    async with get_async_db() as session:
+        listing = await session.get(Listing, listing_id)
+        if not listing:
+            return
+        listing.description_simhash = description_simhash
+        listing.image_dhash = image_dhash
+        await _replace_fingerprint_bands(session, listing)
+        await session.commit()
+
+@traced()
+async def update_rescraped_listing(scraped: Listing) -> tuple[Optional[Listing], set[str]]:
+    """Apply a fresh scrape of a known listing, recording changed fields in listing_history.
+
+    Returns the stored listing and the names of the fields that changed.
+    """
+    async with get_async_db() as session:
+        result = await session.execute(
+            select(Listing).where(Listing.hash == scraped.hash).options(selectinload(Listing.details))
+        )
+        stored = result.scalar_one_or_none()
+        if not stored:
+            return None, set()
+
+        stored.last_scraped_at = datetime.now()
+        fingerprint = _content_fingerprint(scraped)
+        changed_fields = set()
+        if fingerprint != stored.content_fingerprint:
+            for field in TRACKED_LISTING_FIELDS:
+                old_value, new_value = getattr(stored, field), getattr(scraped, field)
+                # A failed extraction shouldn't overwrite a known value
+                if old_value == new_value or new_value in (None, 0, "", []):
+                    continue
+                session.add(ListingHistory(
+                    listing_id=stored.id,
+                    field=field,
+                    old_value=None if old_value is None else _history_value(old_value),
+                    new_value=_history_value(new_value)
+                ))
+                setattr(stored, field, new_value)
+                changed_fields.add(field)
+            old_hashes = (stored.description_simhash, stored.image_dhash)
+            if 'description' in changed_fields:
+                stored.description_simhash = scraped.description_simhash
+            if 'image_urls' in changed_fields:
+                stored.image_dhash = scraped.image_dhash
+                stored.cover_image_url = stored.image_urls[0] if stored.image_urls else None
+            if (stored.description_simhash, stored.image_dhash) != old_hashes:
+                # Repost lookups go through the bands, so they must follow the hashes
+                await _replace_fingerprint_bands(session, stored)
+            stored.content_fingerprint = _content_fingerprint(stored)
+
+        await session.commit()
+        await session.refresh(stored)
+        if changed_fields:
+            affected_job_ids = await _job_ids_for_listings(session, [stored.id])
+            if 'image_urls' in changed_fields:
+                await refresh_job_summaries(session, affected_job_ids)
+                await session.commit()
+            bump_job_versions(affected_job_ids)
+        return stored, changed_fields
+
+async def _job_ids_for_listings(session: AsyncSession, listing_ids: List[UUID]) -> List[UUID]:
+    result = await session.execute(
+        select(JobListingScore.job_id).where(JobListingScore.listing_id.in_(listing_ids)).distinct()
+    )
+    return list(result.scalars().all())
+
+@traced()
+async def mark_listing_for_reevaluation(listing_id: UUID) -> None:
+    """Flag every job's score of a listing for a fresh model evaluation."""
+    async with get_async_db() as session:
+        await session.execute(
+            update(JobListingScore)
+            .where(JobListingScore.listing_id == listing_id)
+            .values(needs_reevaluation=True)
+        )
+        await session.commit()
+
+@traced()
+async def get_listing_scores_for_listing(listing_id: UUID) -> List[JobListingScore]:
+    """Get every job's score of a listing."""
+    async with get_async_db() as session:
+        result = await session.execute(
+            select(JobListingScore)
+            .where(JobListingScore.listing_id == listing_id)
+            .options(selectinload(JobListingScore.traces))
+        )
+        return result.scalars().all()
+
+@traced()
+async def get_listings_due_for_liveness_check(limit: int) -> Dict[UUID, str]:
+    """Get links of live listings not checked within the liveness interval, least recently checked first."""
+    cutoff = datetime.now() - timedelta(hours=LIVENESS_CHECK_INTERVAL_HOURS)
+    async with get_async_db() as session:
+        result = await session.execute(
+            select(Listing.id, Listing.link)
+            .where(
+                Listing.is_live,
+                Listing.link.isnot(None),
+                or_(Listing.liveness_checked_at.is_(None), Listing.liveness_checked_at <= cutoff)
+            )
+            .order_by(Listing.liveness_checked_at.asc().nulls_first())
+            .limit(limit)
+        )
+        return {listing_id: link for listing_id, link in result.all()}
+
+@traced()
+async def record_liveness_results(live_ids: List[UUID], dead_ids: List[UUID]) -> None:
+    """Stamp checked listings and take dead ones out of the hot queries."""
+    now = datetime.now()
+    async with get_async_db() as session:
+        if live_ids:
+            await session.execute(
+                update(Listing).where(Listing.id.in_(live_ids)).values(liveness_checked_at=now)
+            )
+        if dead_ids:
+            await session.execute(
+                update(Listing).where(Listing.id.in_(dead_ids)).values(liveness_checked_at=now, is_live=False)
+            )
+        if dead_ids:
+            affected_job_ids = await _job_ids_for_listings(session, dead_ids)
+            await refresh_job_summaries(session, affected_job_ids)
+        await session.commit()
+        if dead_ids:
+            bump_job_versions(affected_job_ids)
+
+@traced()
+async def get_reusable_evaluation(listing: Listing, job_id: UUID) -> Optional[JobListingScore]:
+    """Get a model evaluation of the canonical post of a repost, preferring the same job."""
+    if not listing.canonical_listing_id:
+        return None
+    async with get_async_db() as session:
+        result = await session.execute(
+            select(JobListingScore)
+            .where(
+                JobListingScore.listing_id == listing.canonical_listing_id,
+                JobListingScore.aesthetic_score.isnot(None)
+            )
+            .order_by((JobListingScore.job_id == job_id).desc(), JobListingScore.updated_at.desc())
+            .options(selectinload(JobListingScore.traces))
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+@traced()
 def get_unevaluated_listings() -> tuple[Session, list[Listing]]:
     """Get listings that haven't been evaluated yet."""
     Session = sessionmaker(bind=engine)
@@ -105,6 +394,7 @@ def get_unevaluated_listings() -> tuple[Session, list[Listing]]:
         session.close()
         raise e
 
+@traced()
 def get_top_listings(limit: int = 10) -> list[Listing]:
     """Get the top scored listings from the database."""
     Session = sessionmaker(bind=engine)
@@ -119,6 +409,17 @@ def get_top_listings(limit: int = 10) -> list[Listing]:
     finally:
         session.close()
 
+@traced()
+def get_stale_listing_hashes():
+    """Hashes of listings last scraped more than LISTING_RESCRAPE_INTERVAL_HOURS ago, due for a rescrape."""
+    cutoff = datetime.now() - timedelta(hours=LISTING_RESCRAPE_INTERVAL_HOURS)
+    with get_db_session() as session:
+        rows = session.execute(
+            select(Listing.hash).where(or_(Listing.last_scraped_at.is_(None), Listing.last_scraped_at < cutoff))
+        )
+        return {row[0] for row in rows}
+
+@traced()
 async def create_job_template(user_id: UUID, job_input: dict) -> JobTemplate:
     async with get_async_db() as session:
         template_data = {
@@ -135,6 +436,7 @@ async def create_job_template(user_id: UUID, job_input: dict) -> JobTemplate:
         await session.refresh(template)
         return template
 
+@traced()
 async def create_job(user_id: UUID, template_id: UUID, name: str) -> Job:
     async with get_async_db() as session:
         now = datetime.now()
@@ -143,137 +445,354 @@ async def create_job(user_id: UUID, template_id: UUID, name: str) -> Job:
             template_id=template_id,
             name=name,
             created_at=now, 
-            updated_at=now
+            updated_at=now,
+            next_run_at=now + timedelta(hours=JOB_REFRESH_INTERVAL_HOURS)
         )
         session.add(job)
         await session.commit()
         await session.refresh(job)
+        bump_user_version(user_id)
         return job
 
-async def get_user_jobs(user_id: UUID):
-    listing_count_subquery = (
-        select(func.count(JobListingScore.listing_id))
-        .where(JobListingScore.job_id == Job.id)
-        .correlate(Job)
-        .scalar_subquery()
-        .label("listing_count")
+@traced()
+async def get_user_jobs(user_id: UUID) -> List[Tuple[Job, Optional[JobSummary]]]:
+    """Jobs the user owns or was invited to, each with its summary; jobs that never linked a listing have none."""
+    query = (
+        select(Job, JobSummary)
+        .outerjoin(JobSummary, JobSummary.job_id == Job.id)
+        .where(_job_access_condition(user_id))
+        .order_by(Job.updated_at.desc(), Job.created_at.desc())
+        .options(lazyload(Job.template), lazyload(Job.user), lazyload(Job.shared_with_users))
     )
 
-    latest_listing_image_subquery = (
-        select(Listing.image_urls)
+    async with get_async_db() as session:
+        result = await session.execute(query)
+        return [(job, summary) for job, summary in result.all()]
+
+def _job_access_condition(user_id: UUID):
+    """SQL condition on Job: the user owns the job or it was shared with them.
+
+    Written as a union rather than an OR, so each branch is an index lookup instead of a scan of jobs.
+    """
+    owned_job = aliased(Job)
+    return Job.id.in_(union_all(
+        select(owned_job.id).where(owned_job.user_id == user_id),
+        select(job_access.c.job_id).where(job_access.c.user_id == user_id)
+    ))
+
+def _cache_job_access(user_id: UUID, job_id: UUID, allowed: bool) -> None:
+    if len(_job_access_cache) >= JOB_ACCESS_CACHE_MAX_ENTRIES:
+        _job_access_cache.clear()
+    _job_access_cache[(user_id, job_id)] = (allowed, time.monotonic() + JOB_ACCESS_CACHE_TTL_SECONDS)
+
+def _weighted_score_expression(weights: Dict[str, float]):
+    """Build a SQL expression re-ranking scores by user-provided component weights.
+
+    Rows scored before components were stored have NULL components, so they fall back to the stored score.
+    """
+    weighted_sum = sum(
+        getattr(JobListingScore, column) * weights.get(column, 1.0)
+        for column in SCORE_COMPONENT_COLUMNS
+    )
+    return func.coalesce(weighted_sum, JobListingScore.score)
+
+def _format_job_listing(listing: Listing, score: JobListingScore, ranked_score: float) -> Dict:
+    return {
+        "id": listing.id,
+        "title": listing.title,
+        "cover_image_url": listing.cover_image_url or NO_IMAGE_URL,
+        "location": listing.location,
+        "cost": listing.price,
+        "bedrooms": listing.bedrooms,
+        "bathrooms": listing.bathrooms,
+        "square_footage": listing.square_footage,
+        "score": ranked_score,
+        "link": listing.link,
+        **{column: getattr(score, column) for column in SCORE_COMPONENT_COLUMNS}
+    }
+
+def _apply_listing_filters(query, filters: Optional[Dict[str, float]], score_expression):
+    """Filter on listing columns and on the score the listings are ranked by, weighted or not."""
+    for name, value in (filters or {}).items():
+        column, comparison = LISTING_FILTERS[name]
+        column = score_expression if column is None else column
+        query = query.where(column >= value if comparison == '>=' else column <= value)
+    return query
+
+def _encode_cursor(sort: str, value: Any, listing_id: UUID) -> str:
+    value = value.isoformat() if isinstance(value, datetime) else value
+    return base64.urlsafe_b64encode(json.dumps([sort, value, str(listing_id)]).encode()).decode()
+
+def _decode_cursor(cursor: str, sort: str) -> Tuple[Any, UUID]:
+    """Raises ValueError for a malformed cursor or one issued for a different sort."""
+    try:
+        cursor_sort, value, listing_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        listing_id = UUID(listing_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if cursor_sort != sort:
+        raise ValueError(f"Cursor was issued for sort '{cursor_sort}', not '{sort}'")
+    # The value is compared against a typed SQL expression, so a wrong type must fail here rather than in the query
+    if sort == 'newest':
+        if not isinstance(value, str):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+    elif sort == 'score':
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        value = float(value)
+    elif isinstance(value, bool) or not isinstance(value, int) or not -2 ** 31 <= value < 2 ** 31:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return value, listing_id
+
+@traced()
+async def get_job_with_listings(
+    job_id: UUID,
+    user_id: UUID,
+    weights: Optional[Dict[str, float]] = None,
+    filters: Optional[Dict[str, float]] = None,
+    sort: str = 'score',
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    fields: Optional[List[str]] = None
+) -> Optional[Tuple[List[Dict], Optional[str]]]:
+    """Get one page of a job's scored listings and the cursor of the next page.
+
+    Pages are keyset-paginated on (sort key, listing ID), so every page is an index range scan no
+    matter how deep. Access is enforced inside the same query. Returns None when the user can't access the job.
+    """
+    score_expression = _weighted_score_expression(weights) if weights else JobListingScore.score
+    sort_column, descending = LISTING_SORTS[sort]
+    if sort_column is None:
+        sort_expression = score_expression
+    elif sort_column is JobListingScore.created_at:
+        sort_expression = sort_column
+    else:
+        sort_expression = func.coalesce(sort_column, -1 if descending else 2 ** 31 - 1)
+
+    query = (
+        select(Listing, JobListingScore, score_expression.label("ranked_score"), sort_expression.label("sort_key"))
         .join(JobListingScore, JobListingScore.listing_id == Listing.id)
-        .where(JobListingScore.job_id == Job.id)
-        .correlate(Job)
-        .order_by(JobListingScore.score.desc())
-        .limit(1)
-        .scalar_subquery()
-        .label("best_listing_images")
+        .options(load_only(*JOB_LISTING_COLUMNS))
+        .where(JobListingScore.job_id == job_id, Listing.is_live)
+        .where(JobListingScore.job_id.in_(select(Job.id).where(Job.id == job_id, _job_access_condition(user_id))))
     )
+    query = _apply_listing_filters(query, filters, score_expression)
+    if cursor:
+        cursor_value, cursor_id = _decode_cursor(cursor, sort)
+        position = tuple_(sort_expression, JobListingScore.listing_id)
+        query = query.where(position < (cursor_value, cursor_id) if descending else position > (cursor_value, cursor_id))
+    if descending:
+        query = query.order_by(sort_expression.desc(), JobListingScore.listing_id.desc())
+    else:
+        query = query.order_by(sort_expression.asc(), JobListingScore.listing_id.asc())
 
-    jt_alias = aliased(JobTemplate, name="template_alias")
+    async with get_async_db() as session:
+        result = await session.execute(query.limit(limit + 1))
+        rows = result.all()
 
+    if rows:
+        _cache_job_access(user_id, job_id, True)
+    elif not await check_job_access(job_id, user_id):
+        # An empty page is either an empty job or one the user can't see; only then is access looked up separately
+        return None
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(sort, rows[-1].sort_key, rows[-1].JobListingScore.listing_id)
+
+    listings = [_format_job_listing(listing, score, ranked_score) for listing, score, ranked_score, _ in rows]
+    if fields:
+        listings = [{field: listing[field] for field in fields} for listing in listings]
+    return listings, next_cursor
+
+async def stream_job_listings(
+    job_id: UUID,
+    weights: Optional[Dict[str, float]] = None,
+    filters: Optional[Dict[str, float]] = None
+) -> AsyncIterator[Dict]:
+    """Stream all of a job's live scored listings, best first, as flat rows for export.
+
+    Rows come from a server-side cursor EXPORT_BATCH_SIZE at a time, so memory stays flat however
+    large the job is. The connection is held until the caller stops iterating. Callers check access first.
+    """
+    score_expression = _weighted_score_expression(weights) if weights else JobListingScore.score
     query = (
-        select(Job, listing_count_subquery, latest_listing_image_subquery)
-        .join(jt_alias, Job.template_id == jt_alias.id)
-        .outerjoin(job_access, job_access.c.job_id == Job.id)
-        .where(
-            or_(
-                Job.user_id == user_id,
-                job_access.c.user_id == user_id
-            )
+        select(
+            Listing.id, Listing.title, Listing.cover_image_url, Listing.location, Listing.price.label("cost"),
+            Listing.bedrooms, Listing.bathrooms, Listing.square_footage, score_expression.label("score"), Listing.link,
+            *[getattr(JobListingScore, column) for column in SCORE_COMPONENT_COLUMNS]
         )
-        .group_by(
-            Job.id,
-            jt_alias.id,
-            jt_alias.user_id,
-            jt_alias.min_bedrooms,
-            jt_alias.min_square_feet,
-            jt_alias.min_bathrooms,
-            jt_alias.target_price_bedroom,
-            jt_alias.criteria,
-            jt_alias.location,
-            jt_alias.zipcode,
-            jt_alias.search_distance_miles,
-            jt_alias.created_at
-        )
-        .order_by(Job.updated_at.desc(), Job.created_at.desc())
-        .options(contains_eager(Job.template, alias=jt_alias))
+        .join(JobListingScore, JobListingScore.listing_id == Listing.id)
+        .where(JobListingScore.job_id == job_id, Listing.is_live)
+        .order_by(score_expression.desc(), JobListingScore.listing_id.desc())
     )
-    
+    query = _apply_listing_filters(query, filters, score_expression)
     async with get_async_db() as session:
-        result = await session.execute(query)
-        jobs_data = []
-        for job_instance, count, images in result.all():
-            image_urls_list = []
-            if images and isinstance(images, str):
-                try:
-                    loaded_images = json.loads(images)
-                    if isinstance(loaded_images, list):
-                        image_urls_list = loaded_images
-                except json.JSONDecodeError:
-                    pass
-            elif isinstance(images, list):
-                image_urls_list = images
-
-            jobs_data.append((job_instance, count if count is not None else 0, image_urls_list[0] if image_urls_list else NO_IMAGE_URL))
-        return jobs_data
-
-async def get_job_with_listings(job_id: UUID, user_id: UUID) -> Optional[List[Dict]]:
-    if not await check_job_access(job_id, user_id):
-        return None
-            
+        result = await session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            for row in rows:
+                yield dict(row._mapping)
+
+@traced()
+async def get_job_listing(job_id: UUID, listing_id: UUID) -> Optional[Dict]:
+    """Get a single scored listing of a job, formatted like get_job_with_listings."""
     async with get_async_db() as session:
         result = await session.execute(
             select(Listing, JobListingScore)
             .join(JobListingScore, JobListingScore.listing_id == Listing.id)
-            .where(JobListingScore.job_id == job_id)
-            .order_by(JobListingScore.score.desc())
+            .where(JobListingScore.job_id == job_id, JobListingScore.listing_id == listing_id)
         )
-        listing_scores = result.all()
-        
-        if not listing_scores:
-            return []
-            
-        formatted_listings = []
-        for listing, score in listing_scores:
-            image_urls = json.loads(listing.image_urls) if listing.image_urls else []
-            formatted_listings.append({
-                "id": listing.id,
-                "title": listing.title,
-                "cover_image_url": image_urls[0] if image_urls else NO_IMAGE_URL,
-                "location": listing.location,
-                "cost": listing.price,
-                "bedrooms": listing.bedrooms,
-                "bathrooms": listing.bathrooms,
-                "square_footage": listing.square_footage,
-                "score": score.score,
-                "trace": score.trace,
-                "link": listing.link
-            })
-        
-        return formatted_listings
+        row = result.first()
+        if not row:
+            return None
+        listing, score = row
+        return _format_job_listing(listing, score, score.score)
 
-async def update_job_listing_score(job_id: UUID, listing_id: UUID, score: float, trace: str):
-    """Update or create a score for a specific listing in a job."""
+@traced()
+async def get_job_listing_detail(job_id: UUID, listing_id: UUID) -> Optional[Dict]:
+    """Get a single scored listing of a job with the description and reasoning traces the list view leaves out."""
+    async with get_async_db() as session:
+        result = await session.execute(
+            select(Listing, JobListingScore)
+            .join(JobListingScore, JobListingScore.listing_id == Listing.id)
+            .where(JobListingScore.job_id == job_id, JobListingScore.listing_id == listing_id)
+            .options(selectinload(Listing.details), selectinload(JobListingScore.traces))
+        )
+        row = result.first()
+        if not row:
+            return None
+        listing, score = row
+        return {
+            **_format_job_listing(listing, score, score.score),
+            "description": listing.description,
+            "trace": score.trace,
+            "heuristic_trace": score.heuristic_trace,
+            "aesthetic_trace": score.aesthetic_trace
+        }
+
+async def _fold_score_into_summary(session: AsyncSession, job_id: UUID, listing_id: UUID, is_new: bool, old_score: float, new_score: float) -> None:
+    """Apply one score write to the job's summary with a single upsert, so concurrent evaluate tasks can't lose counts.
+
+    Summaries only count live listings, like refresh_job_summaries, so the upsert selects nothing for one that isn't.
+    """
+    live_listing = (
+        select(
+            literal(job_id, JobSummary.job_id.type),
+            literal(int(is_new)),
+            literal(int(new_score != 0) - int(not is_new and old_score != 0)),
+            literal(new_score, JobSummary.top_score.type),
+            Listing.id,
+            Listing.cover_image_url,
+            literal(datetime.now() if is_new else None, JobSummary.last_new_listing_at.type)
+        )
+        .where(Listing.id == listing_id, Listing.is_live)
+    )
+    insert_stmt = pg_insert(JobSummary).from_select(
+        ['job_id', 'listing_count', 'evaluated_count', 'top_score', 'top_listing_id', 'cover_image_url', 'last_new_listing_at'],
+        live_listing
+    )
+    excluded = insert_stmt.excluded
+    beats_top = or_(JobSummary.top_score.is_(None), excluded.top_score > JobSummary.top_score)
+    await session.execute(insert_stmt.on_conflict_do_update(
+        index_elements=[JobSummary.job_id],
+        set_={
+            'listing_count': JobSummary.listing_count + excluded.listing_count,
+            'evaluated_count': JobSummary.evaluated_count + excluded.evaluated_count,
+            'top_score': case((beats_top, excluded.top_score), else_=JobSummary.top_score),
+            'top_listing_id': case((beats_top, excluded.top_listing_id), else_=JobSummary.top_listing_id),
+            'cover_image_url': case((beats_top, excluded.cover_image_url), else_=JobSummary.cover_image_url),
+            'last_new_listing_at': func.coalesce(excluded.last_new_listing_at, JobSummary.last_new_listing_at),
+            'updated_at': func.now()
+        }
+    ))
+    if not is_new and new_score < old_score:
+        # The top listing lost score, so the new top can only be found by looking at all of them
+        top_listing_id = (await session.execute(
+            select(JobSummary.top_listing_id).where(JobSummary.job_id == job_id)
+        )).scalar_one_or_none()
+        if top_listing_id == listing_id:
+            await refresh_job_summaries(session, [job_id])
+
+async def refresh_job_summaries(session: AsyncSession, job_ids: List[UUID]) -> None:
+    """Recompute job summaries from scratch, after changes that incremental updates can't follow."""
+    if not job_ids:
+        return
+    by_score = JobListingScore.score.desc()
+    result = await session.execute(
+        select(
+            JobListingScore.job_id,
+            func.count(),
+            func.count().filter(JobListingScore.score != 0),
+            func.max(JobListingScore.score),
+            array_agg(aggregate_order_by(JobListingScore.listing_id, by_score))[1],
+            array_agg(aggregate_order_by(Listing.cover_image_url, by_score))[1],
+            func.max(JobListingScore.created_at)
+        )
+        .join(Listing, JobListingScore.listing_id == Listing.id)
+        .where(JobListingScore.job_id.in_(job_ids), Listing.is_live)
+        .group_by(JobListingScore.job_id)
+    )
+    aggregates = {row[0]: row[1:] for row in result.all()}
+    for job_id in set(job_ids):
+        listing_count, evaluated_count, top_score, top_listing_id, cover_image_url, last_new_listing_at = (
+            aggregates.get(job_id, (0, 0, None, None, None, None))
+        )
+        values = dict(
+            listing_count=listing_count, evaluated_count=evaluated_count, top_score=top_score,
+            top_listing_id=top_listing_id, cover_image_url=cover_image_url, last_new_listing_at=last_new_listing_at
+        )
+        await session.execute(
+            pg_insert(JobSummary).values(job_id=job_id, **values)
+            .on_conflict_do_update(index_elements=[JobSummary.job_id], set_={**values, 'updated_at': func.now()})
+        )
+
+@traced()
+async def update_job_listing_score(job_id: UUID, listing_id: UUID, score: float, trace: str, components: Optional[Dict] = None):
+    """Update or create a score for a specific listing in a job, keeping the job's summary current.
+
+    `components` maps score component and trace column names to their values.
+    """
+    components = dict(components or {})
     async with get_async_db() as session:
         # Get or create job listing score
-        score_obj = await session.get(JobListingScore, {'job_id': job_id, 'listing_id': listing_id})
+        score_obj = await session.get(
+            JobListingScore, {'job_id': job_id, 'listing_id': listing_id}, options=[selectinload(JobListingScore.traces)]
+        )
+        is_new = score_obj is None
+        old_score = 0 if is_new else score_obj.score
+        traces = {'trace': trace, **{column: components.pop(column) for column in TRACE_COLUMNS if column in components}}
         if not score_obj:
             score_obj = JobListingScore(
                 job_id=job_id,
                 listing_id=listing_id,
                 score=score,
-                trace=trace
+                **components
             )
             session.add(score_obj)
         else:
             score_obj.score = score
-            score_obj.trace = trace
+            for column, value in components.items():
+                setattr(score_obj, column, value)
             score_obj.updated_at = datetime.now()
+        # Unevaluated links carry no trace, so their side-table row waits for the first real one
+        if score_obj.traces is not None or any(traces.values()):
+            for column, value in traces.items():
+                setattr(score_obj, column, value)
+        if 'aesthetic_score' in components:
+            score_obj.needs_reevaluation = False
+        await session.flush()
+        await _fold_score_into_summary(session, job_id, listing_id, is_new, old_score, score)
         
         await session.commit()
+        bump_job_versions([job_id])
         return score_obj
 
+@traced()
 async def get_pending_jobs() -> List[Job]:
     """Get jobs that haven't been updated in 24 hours"""
     async with get_async_db() as session:
@@ -283,29 +802,207 @@ async def get_pending_jobs() -> List[Job]:
         )
         return result.scalars().all()
     
-async def get_next_pending_job() -> Optional[Job]:
-    """Get the oldest job that hasn't been updated in 24 hours"""
+@traced()
+async def claim_due_jobs(limit: int) -> List[Job]:
+    """Claim up to `limit` due jobs by leasing them.
+
+    Rows are locked with FOR UPDATE SKIP LOCKED, so concurrent dispatchers on other replicas
+    claim disjoint batches, and a job stays claimed until its lease expires or the run completes.
+    """
+    now = datetime.now()
+    async with get_async_db() as session:
+        result = await session.execute(
+            select(Job.id)
+            .where(
+                Job.next_run_at <= now,
+                or_(Job.lease_expires_at.is_(None), Job.lease_expires_at <= now)
+            )
+            .order_by(Job.next_run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        job_ids = result.scalars().all()
+        if not job_ids:
+            await session.commit()
+            return []
+
+        await session.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids))
+            # Keep updated_at, which records the last completed run, from being bumped by onupdate
+            .values(lease_expires_at=now + timedelta(seconds=JOB_LEASE_SECONDS), updated_at=Job.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+        # Templates are loaded after locking, since FOR UPDATE can't apply to the outer join that eager-loads them
+        jobs_result = await session.execute(select(Job).where(Job.id.in_(job_ids)))
+        return jobs_result.unique().scalars().all()
+
+@traced()
+async def extend_job_leases(job_ids: List[UUID]) -> None:
+    """Push the jobs' leases a full JOB_LEASE_SECONDS out, for runs that wait or start after they were claimed."""
+    async with get_async_db() as session:
+        await session.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids))
+            .values(lease_expires_at=datetime.now() + timedelta(seconds=JOB_LEASE_SECONDS), updated_at=Job.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+@traced()
+async def complete_job_run(job_id: UUID, next_run_at: datetime, new_listing_rate: float) -> None:
+    """Mark a job as freshly run, schedule its next run and release its lease."""
+    async with get_async_db() as session:
+        await session.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(updated_at=datetime.now(), lease_expires_at=None, next_run_at=next_run_at, new_listing_rate=new_listing_rate)
+        )
+        await session.commit()
+    # The job list shows when each job last ran
+    bump_job_versions([job_id])
+
+@traced()
+async def count_job_listings(job_id: UUID) -> int:
     async with get_async_db() as session:
-        one_day_ago = datetime.now() - timedelta(days=1)
         result = await session.execute(
-            select(Job).where(Job.updated_at <= one_day_ago).order_by(Job.updated_at).limit(1)
+            select(func.count(JobListingScore.listing_id)).where(JobListingScore.job_id == job_id)
         )
-        return result.scalars().first()
+        return result.scalar_one()
 
+@traced()
+async def record_job_view(job_id: UUID) -> None:
+    """Note that someone looked at a job's results; throttled so polling doesn't write on every request."""
+    now = datetime.now()
+    async with get_async_db() as session:
+        await session.execute(
+            update(Job)
+            .where(
+                Job.id == job_id,
+                or_(Job.last_viewed_at.is_(None), Job.last_viewed_at <= now - timedelta(minutes=JOB_VIEW_RECORD_INTERVAL_MINUTES))
+            )
+            .values(last_viewed_at=now, updated_at=Job.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+@traced()
+async def get_job_checkpoint(job_id: UUID) -> Optional[Dict]:
+    """Get the checkpointed state of a job's in-flight run, if it is recent enough to resume."""
+    async with get_async_db() as session:
+        checkpoint = await session.get(JobCheckpoint, job_id)
+        if not checkpoint:
+            return None
+        if checkpoint.updated_at and checkpoint.updated_at.replace(tzinfo=None) < datetime.now() - timedelta(hours=CHECKPOINT_MAX_AGE_HOURS):
+            await session.delete(checkpoint)
+            await session.commit()
+            return None
+        return checkpoint.state
+
+@traced()
+async def save_job_checkpoint(job_id: UUID, state: Dict) -> None:
+    async with get_async_db() as session:
+        checkpoint = await session.get(JobCheckpoint, job_id)
+        if not checkpoint:
+            session.add(JobCheckpoint(job_id=job_id, state=state))
+        else:
+            checkpoint.state = state
+            checkpoint.updated_at = datetime.now()
+        await session.commit()
+
+@traced()
+async def clear_job_checkpoint(job_id: UUID) -> None:
+    async with get_async_db() as session:
+        if (checkpoint := await session.get(JobCheckpoint, job_id)):
+            await session.delete(checkpoint)
+            await session.commit()
+
+@traced()
+async def start_job_runs(job_ids: List[UUID]) -> Dict[UUID, UUID]:
+    """Open a run record for each job. Returns the run ID per job."""
+    async with get_async_db() as session:
+        runs = {job_id: JobRun(job_id=job_id, status='running', started_at=datetime.now()) for job_id in job_ids}
+        session.add_all(runs.values())
+        await session.commit()
+        return {job_id: run.id for job_id, run in runs.items()}
+
+@traced()
+async def finish_job_run(run_id: UUID, status: str, counters: Dict[str, float]) -> None:
+    """Close the scrape stage of a run with its final counters and stage durations."""
+    async with get_async_db() as session:
+        await session.execute(
+            update(JobRun)
+            .where(JobRun.id == run_id)
+            .values(status=status, finished_at=datetime.now(), **counters)
+        )
+        await session.commit()
+
+@traced()
+async def record_job_run_evaluations(run_id: UUID, done: int, failed: int, cached: int, tokens: int, seconds: float, finished: bool = False) -> None:
+    """Add one evaluate task's results to its run; evaluate tasks run concurrently, so counters are incremented in SQL."""
+    values = dict(
+        evaluations_done=JobRun.evaluations_done + done,
+        evaluations_failed=JobRun.evaluations_failed + failed,
+        evaluations_cached=JobRun.evaluations_cached + cached,
+        tokens_used=JobRun.tokens_used + tokens,
+        evaluation_seconds=JobRun.evaluation_seconds + seconds
+    )
+    if finished:
+        values['evaluated_at'] = datetime.now()
+    async with get_async_db() as session:
+        await session.execute(update(JobRun).where(JobRun.id == run_id).values(**values))
+        await session.commit()
+
+@traced()
+async def get_job_runs(job_id: UUID, since: Optional[datetime] = None, limit: int = 50) -> List[JobRun]:
+    """A job's most recent runs, newest first."""
+    async with get_async_db() as session:
+        query = select(JobRun).where(JobRun.job_id == job_id)
+        if since:
+            query = query.where(JobRun.started_at >= since)
+        result = await session.execute(query.order_by(JobRun.started_at.desc()).limit(limit))
+        return list(result.scalars().all())
+
+@traced()
 async def get_listing_by_id(listing_id: UUID) -> Optional[Listing]:
-    """Get a listing by its UUID."""
+    """Get a listing by its UUID, with its description."""
     async with get_async_db() as session:
-        result = await session.get(Listing, listing_id)
+        result = await session.get(Listing, listing_id, options=[selectinload(Listing.details)])
         return result
 
-async def get_job_listing_scores(job_id: UUID) -> List[JobListingScore]:
-    """Get all listing scores for a specific job."""
+@traced()
+async def get_job_listing_scores(job_id: UUID, listing_ids: Optional[List[UUID]] = None) -> List[JobListingScore]:
+    """Get listing scores for a specific job, optionally limited to some listings, skipping listings that are no longer live."""
+    query = (
+        select(JobListingScore)
+        .join(Listing, JobListingScore.listing_id == Listing.id)
+        .where(JobListingScore.job_id == job_id, Listing.is_live)
+    )
+    if listing_ids is not None:
+        query = query.where(JobListingScore.listing_id.in_(listing_ids))
+    async with get_async_db() as session:
+        result = await session.execute(query)
+        return result.scalars().all()
+
+@traced()
+async def get_pending_evaluation_listing_ids(job_id: UUID) -> List[UUID]:
+    """Get IDs of a job's live listings that still need a (re-)evaluation."""
     async with get_async_db() as session:
         result = await session.execute(
-            select(JobListingScore).where(JobListingScore.job_id == job_id)
+            select(JobListingScore.listing_id)
+            .join(Listing, JobListingScore.listing_id == Listing.id)
+            .where(
+                JobListingScore.job_id == job_id,
+                Listing.is_live,
+                # Inlined rather than bound, so the planner can match ix_job_listing_scores_pending
+                or_(JobListingScore.score == literal_column("0"), JobListingScore.needs_reevaluation)
+            )
         )
         return result.scalars().all()
 
+@traced()
 async def get_listing_id_by_hash(listing_hashes: List[str]) -> List[UUID]:
     """Get listing IDs by their hashes."""
     async with get_async_db() as session:
@@ -315,6 +1012,7 @@ async def get_listing_id_by_hash(listing_hashes: List[str]) -> List[UUID]:
         return result.scalars().all()
         
 
+@traced()
 async def filter_listing_ids_on_job(job_id: UUID, listing_ids: List[UUID]) -> List[UUID]:
     """Get listing IDs that already have a relationship with the given job."""
     async with get_async_db() as session:
@@ -328,11 +1026,13 @@ async def filter_listing_ids_on_job(job_id: UUID, listing_ids: List[UUID]) -> Li
         )
         return result.scalars().all()
 
+@traced()
 async def get_user_by_email(email: str) -> Optional[User]:
     async with get_async_db() as session:
         result = await session.execute(select(User).where(User.email == email))
         return result.scalar_one_or_none()
 
+@traced()
 async def create_invited_user(email: str) -> User:
     async with get_async_db() as session:
         new_user = User(email=email, account_status='invited', is_active=False)
@@ -341,36 +1041,37 @@ async def create_invited_user(email: str) -> User:
         await session.refresh(new_user)
         return new_user
 
+@traced()
 async def add_user_to_job_access(user_id: UUID, job_id: UUID) -> bool:
+    """Share a job with a user. Returns False if they already had access."""
     async with get_async_db() as session:
-        existing_access_result = await session.execute(
-            select(job_access).where(
-                and_(job_access.c.user_id == user_id, job_access.c.job_id == job_id)
-            )
+        result = await session.execute(
+            pg_insert(job_access).values(user_id=user_id, job_id=job_id)
+            .on_conflict_do_nothing()
+            .returning(job_access.c.job_id)
         )
-        if existing_access_result.scalar_one_or_none():
-            return False
-
-        stmt = job_access.insert().values(user_id=user_id, job_id=job_id)
-        await session.execute(stmt)
+        granted = result.scalar_one_or_none() is not None
         await session.commit()
-        return True
+    _job_access_cache.pop((user_id, job_id), None)
+    if granted:
+        bump_user_version(user_id)
+    return granted
 
+@traced()
 async def check_job_access(job_id: UUID, user_id: UUID) -> bool:
+    """Whether the user owns or was invited to the job, answered from the per-process cache when fresh."""
+    key = (user_id, job_id)
+    if (cached := _job_access_cache.get(key)) and cached[1] > time.monotonic():
+        return cached[0]
     async with get_async_db() as session:
-        job_owner_result = await session.execute(select(Job).where(and_(Job.id == job_id, Job.user_id == user_id)))
-        if job_owner_result.scalar_one_or_none():
-            return True
-        
-        shared_access_result = await session.execute(
-            select(job_access).where(
-                and_(job_access.c.user_id == user_id, job_access.c.job_id == job_id)
-            )
-        )
-        return shared_access_result.scalar_one_or_none() is not None
+        result = await session.execute(select(Job.id).where(Job.id == job_id, _job_access_condition(user_id)))
+        allowed = result.scalar_one_or_none() is not None
+    _cache_job_access(user_id, job_id, allowed)
+    return allowed
 
+@traced()
 async def get_job_by_id(job_id: UUID) -> Optional[Job]:
     async with get_async_db() as session:
-        job = await session.get(Job, job_id)
+        job = await session.get(Job, job_id, options=[lazyload(Job.template), lazyload(Job.user), lazyload(Job.shared_with_users)])
         return job
 
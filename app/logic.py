@@ -1,92 +1,305 @@
 import asyncio
+import itertools
+import time
 from functools import wraps
-from typing import List, Set
+from datetime import datetime
+from typing import Dict, List, Optional, Set
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.evaluator import evaluate_listing_aesthetics, evaluate_listing_hueristics
+from app.core.evaluator import evaluate_listing_aesthetics, evaluate_listing_hueristic_components
 from app.models.models import Listing, Job
 from app.db.database import (
     filter_listing_ids_on_job, get_async_db, get_listing_id_by_hash, get_stored_listing_hashes, save_new_listings_to_db,
-    update_job_listing_score, get_listing_by_id, get_job_listing_scores
+    update_job_listing_score, get_listing_by_id, get_job_listing_scores, get_reusable_evaluation,
+    update_rescraped_listing, mark_listing_for_reevaluation, get_listing_scores_for_listing,
+    get_listings_due_for_liveness_check, record_liveness_results, get_job_listing, complete_job_run,
+    get_pending_evaluation_listing_ids, get_job_checkpoint, save_job_checkpoint, clear_job_checkpoint,
+    count_job_listings, start_job_runs, finish_job_run, record_job_run_evaluations,
+    get_listings_missing_fingerprints, save_listing_fingerprints, extend_job_leases
 )
 
-from app.core.base_scraper import ScrapingConfig
+from app.core.base_scraper import ScrapeCheckpoint, ScrapingConfig
 from app.core.craiglist_scraper import CraigslistScraper
+from app.core.liveness import check_listings_live
+from app.core.similarity import description_simhash, image_dhash
+from app.config import FINGERPRINT_BACKFILL_BATCH_SIZE, LIVENESS_BATCH_SIZE, LIVENESS_CONCURRENCY
 from app.services.celery_app import celery
+from app.services.events import publish_job_event
+from app.services.worker_runtime import runtime
+from app.services.refresh_policy import compute_next_run_at, smoothed_new_listing_rate
+from app.services import fair_scheduler
+from app.services.metrics import EVALUATIONS, JOB_RUNS, JOB_STAGE_SECONDS
 BATCH_SIZE = 5
 SLEEP_TIME = 0.2
+# Listings per evaluation task handed from the scrape queue to the evaluate queue
+EVALUATION_BATCH_SIZE = 5
+# Known listings linked per flush; flushes are also the points where scrape progress is checkpointed
+MEMOIZED_BATCH_SIZE = 25
+# How long a job waits, and how often it retries, when its owner is at their concurrent scrape limit
+SCRAPE_SLOT_RETRY_SECONDS = 60
+SCRAPE_SLOT_MAX_RETRIES = 30
 
-async def batch_database_save(upsert_listings: List[Listing], job_id: UUID, session: AsyncSession) -> List[Listing]:
+# Listing fields feeding each part of the score; edits to other fields never trigger re-evaluation
+HEURISTIC_FIELDS = {'price', 'bedrooms', 'bathrooms', 'square_footage'}
+AESTHETIC_FIELDS = {'description', 'image_urls'}
+
+class JobRunStats:
+    """Counters collected over one job run"""
+    def __init__(self):
+        self.new_links = 0  # Listings linked to the job for the first time
+        self.changed_listings = 0  # Known listings whose content changed on rescrape
+        self.pages_loaded = 0
+        self.listings_new = 0
+        self.listings_known = 0
+        self.listings_rejected = 0
+        self.evaluations_done = 0
+        self.evaluations_failed = 0
+        self.evaluations_cached = 0
+        self.tokens_used = 0
+        self.stage_seconds = {'scrape': 0.0, 'db_write': 0.0}
+
+    def absorb_scrape(self, scrape: 'JobRunStats') -> None:
+        """Take the counters of a scrape shared with other jobs."""
+        self.pages_loaded = scrape.pages_loaded
+        self.listings_new = scrape.listings_new
+        self.listings_known = scrape.listings_known
+        self.listings_rejected = scrape.listings_rejected
+        self.stage_seconds['scrape'] = scrape.stage_seconds['scrape']
+        self.stage_seconds['db_write'] = scrape.stage_seconds['db_write']
+
+    def scrape_counters(self) -> Dict[str, float]:
+        """Columns of the job run written when the scrape stage ends."""
+        return {
+            'pages_loaded': self.pages_loaded,
+            'listings_new': self.listings_new,
+            'listings_known': self.listings_known,
+            'listings_rejected': self.listings_rejected,
+            'listings_linked': self.new_links,
+            'scrape_seconds': self.stage_seconds['scrape'],
+            'db_write_seconds': self.stage_seconds['db_write']
+        }
+
+async def publish_job_listing(job_id: UUID, listing_id: UUID, event: str) -> None:
+    """Push a job's listing to clients streaming the job's events."""
+    if (job_listing := await get_job_listing(job_id, listing_id)):
+        publish_job_event(job_id, event, job_listing)
+
+def enqueue_evaluations(job: Job, listing_ids: List[UUID], run_id: Optional[UUID] = None) -> None:
+    """Hand listings in batches to the fair scheduler, which feeds the evaluate queue."""
+    batches = [listing_ids[i:i + EVALUATION_BATCH_SIZE] for i in range(0, len(listing_ids), EVALUATION_BATCH_SIZE)]
+    fair_scheduler.submit_evaluations(job.user_id, job.id, batches, job.user.scheduling_weight if job.user else 1.0, run_id)
+
+async def link_listings_to_job(job: Job, listing_ids: List[UUID], run_id: Optional[UUID] = None) -> List[UUID]:
+    """Link listings the job doesn't have yet and queue them for evaluation. Returns the newly linked listing IDs."""
+    existing_ids = set(await filter_listing_ids_on_job(job.id, listing_ids))
+    linked_ids = [li for li in listing_ids if li not in existing_ids]
+    for li in linked_ids:
+        await update_job_listing_score(job.id, li, 0, "")
+        await publish_job_listing(job.id, li, "listing_added")
+    enqueue_evaluations(job, linked_ids, run_id)
+    return linked_ids
+
+async def batch_database_save(upsert_listings: List[Listing], jobs: List[Job], session: AsyncSession, run_ids: Optional[Dict[UUID, UUID]] = None) -> Dict[UUID, List[UUID]]:
+    """Save new listings and link them to each job. Returns the newly linked listing IDs per job."""
+    run_ids = run_ids or {}
     saved_listings = await save_new_listings_to_db(upsert_listings)
-    for listing in saved_listings:
-        await update_job_listing_score(job_id, listing.id, 0, "")
-    return []
+    listing_ids = [listing.id for listing in saved_listings]
+    return {job.id: await link_listings_to_job(job, listing_ids, run_ids.get(job.id)) for job in jobs}
 
-async def batch_memoized_score_update(job_id: UUID, listing_hashes: List[str], session: AsyncSession) -> None:
-    """Update job-listing relationships for existing listings."""
+async def batch_memoized_score_update(jobs: List[Job], listing_hashes: List[str], session: AsyncSession, run_ids: Optional[Dict[UUID, UUID]] = None) -> Dict[UUID, List[UUID]]:
+    """Update job-listing relationships for existing listings. Returns the newly linked listing IDs per job."""
+    run_ids = run_ids or {}
     listing_ids = await get_listing_id_by_hash(listing_hashes)
-    existing_ids = await filter_listing_ids_on_job(job_id, listing_ids)
-    for li in listing_ids:
-        if li not in existing_ids:
-            await update_job_listing_score(job_id, li, 0, "")
-
-async def scrape_listings(job: Job, session: AsyncSession):
-    print(f"[DEBUG] Starting scrape_listings for job {job.id}")
-    print(f"[DEBUG] Job template: {job.template}")
-    config = ScrapingConfig.from_job_template(job.template)
+    return {job.id: await link_listings_to_job(job, listing_ids, run_ids.get(job.id)) for job in jobs}
+
+async def refresh_rescraped_listing(scraped: Listing) -> bool:
+    """Record edits to a known listing and re-score it only as far as the edits require. Returns whether it changed."""
+    listing, changed_fields = await update_rescraped_listing(scraped)
+    if not listing or not changed_fields:
+        return False
+    print(f"[DEBUG] Listing {listing.post_id} changed: {', '.join(sorted(changed_fields))}")
+
+    if changed_fields & AESTHETIC_FIELDS:
+        await mark_listing_for_reevaluation(listing.id)
+        return True
+
+    if changed_fields & HEURISTIC_FIELDS:
+        # Only the heuristics moved, so recompute them against the stored model score without an LLM call
+        scores = await get_listing_scores_for_listing(listing.id)
+        # A score without a stored model component needs a full evaluation anyway, which re-scores every job
+        if any(score.aesthetic_score is None for score in scores):
+            await mark_listing_for_reevaluation(listing.id)
+            return True
+        hueristic_components, hueristic_trace = evaluate_listing_hueristic_components(listing)
+        for score in scores:
+            await update_job_listing_score(
+                score.job_id, listing.id,
+                sum(hueristic_components.values()) + score.aesthetic_score,
+                f"{hueristic_trace} | {score.aesthetic_trace}",
+                components={**hueristic_components, 'heuristic_trace': hueristic_trace}
+            )
+    return True
+
+async def scrape_listings(
+    jobs: List[Job], session: AsyncSession, stats_by_job: Dict[UUID, JobRunStats], run_ids: Optional[Dict[UUID, UUID]] = None
+) -> Dict[UUID, Set[UUID]]:
+    """Run one scrape for jobs sharing a search and fan the listings out to each job, queueing them for
+    evaluation as it goes. Returns the queued listing IDs per job."""
+    lead_job = jobs[0]
+    job_ids = [job.id for job in jobs]
+    print(f"[DEBUG] Starting scrape_listings for jobs {', '.join(str(job_id) for job_id in job_ids)}")
+    print(f"[DEBUG] Job template: {lead_job.template}")
+    config = ScrapingConfig.from_job_template(lead_job.template)
     print(f"[DEBUG] Created scraping config: min_price={config.min_price}, max_price={config.max_price}, min_bedrooms={config.min_bedrooms}")
     
     stored_hashes = get_stored_listing_hashes()
     print(f"[DEBUG] Retrieved {len(stored_hashes)} stored listing hashes")
     
-    print(f"[DEBUG] Initializing CraigslistScraper for job {job.id}")
+    print(f"[DEBUG] Initializing CraigslistScraper for job {lead_job.id}")
+    # Counters of the shared scrape, copied to every job's run when it ends
+    scrape_stats = JobRunStats()
+    started = time.monotonic()
     with CraigslistScraper.create(config) as scraper:
+        # A group's progress is checkpointed under its lead job
+        if (checkpoint_state := await get_job_checkpoint(lead_job.id)):
+            scraper.checkpoint = ScrapeCheckpoint.from_dict(checkpoint_state)
+            print(f"[DEBUG] Resuming job {lead_job.id} from checkpoint: {scraper.checkpoint.pages_crawled} pages crawled, {len(scraper.checkpoint.processed_urls)} URLs processed")
+
+        async def _save_checkpoint(checkpoint: ScrapeCheckpoint):
+            await save_job_checkpoint(lead_job.id, checkpoint.to_dict())
+        scraper.on_checkpoint = _save_checkpoint
+        # Page loads of a shared scrape are split across the jobs' owners in turn, skipping owners out of budget,
+        # so the scrape stops only once every owner is out
+        owner_ids = list(dict.fromkeys(job.user_id for job in jobs))
+        owner_turns = itertools.cycle(owner_ids)
+        page_payer = {}
+        def _allow_page_load() -> bool:
+            page_payer["user_id"] = next(
+                (owner_id for owner_id in itertools.islice(owner_turns, len(owner_ids))
+                 if fair_scheduler.within_budget("pages", owner_id)),
+                None
+            )
+            return page_payer["user_id"] is not None
+        def _on_page_load(url: str):
+            scrape_stats.pages_loaded += 1
+            fair_scheduler.record_usage("pages", page_payer["user_id"], 1)
+        scraper.allow_page_load = _allow_page_load
+        scraper.on_page_load = _on_page_load
+
         upsert_listings = []
         listing_hashes_from_scrape = []
-        print(f"[DEBUG] Starting scraping loop for job {job.id}")
+        enqueued_ids = {
+            job_id: {UUID(listing_id) for listing_id in scraper.checkpoint.enqueued_listing_ids.get(str(job_id), [])}
+            for job_id in job_ids
+        }
+
+        def _record_links(linked_by_job: Dict[UUID, List[UUID]]):
+            for job_id, linked_ids in linked_by_job.items():
+                stats_by_job[job_id].new_links += len(linked_ids)
+                enqueued_ids[job_id].update(linked_ids)
+
+        async def _flush():
+            # Everything yielded so far is persisted after this, so processed URLs are safe to checkpoint
+            nonlocal upsert_listings, listing_hashes_from_scrape
+            flush_started = time.monotonic()
+            if upsert_listings:
+                scrape_stats.listings_new += len(upsert_listings)
+                _record_links(await batch_database_save(upsert_listings, jobs, session, run_ids))
+                upsert_listings = []
+            if listing_hashes_from_scrape:
+                scrape_stats.listings_known += len(listing_hashes_from_scrape)
+                _record_links(await batch_memoized_score_update(jobs, listing_hashes_from_scrape, session, run_ids))
+                listing_hashes_from_scrape = []
+            scraper.checkpoint.enqueued_listing_ids = {
+                str(job_id): {str(listing_id) for listing_id in listing_ids}
+                for job_id, listing_ids in enqueued_ids.items()
+            }
+            await scraper.save_checkpoint()
+            scrape_stats.stage_seconds['db_write'] += time.monotonic() - flush_started
+
+        print(f"[DEBUG] Starting scraping loop for job {lead_job.id}")
         
-        async for scrape_output in scraper.scrape():
-            if isinstance(scrape_output, str):  # It's a hash
-                listing_hashes_from_scrape.append(scrape_output)
-            else:  # It's a new listing
-                if isinstance(scrape_output, Listing) and scrape_output.hash not in stored_hashes:
-                    upsert_listings.append(scrape_output)
-                
-            if len(upsert_listings) >= BATCH_SIZE:
-                upsert_listings = await batch_database_save(upsert_listings, job.id, session)
-                    
-        if upsert_listings:
-            upsert_listings = await batch_database_save(upsert_listings, job.id, session)
-            
-        if listing_hashes_from_scrape:
-            await batch_memoized_score_update(job.id, listing_hashes_from_scrape, session)
+        try:
+            async for scrape_output in scraper.scrape():
+                if isinstance(scrape_output, str):  # It's a hash
+                    listing_hashes_from_scrape.append(scrape_output)
+                else:  # It's a new or rescraped listing
+                    if isinstance(scrape_output, Listing) and scrape_output.hash not in stored_hashes:
+                        upsert_listings.append(scrape_output)
+                    elif isinstance(scrape_output, Listing):
+                        if await refresh_rescraped_listing(scrape_output):
+                            for stats in stats_by_job.values():
+                                stats.changed_listings += 1
+                        listing_hashes_from_scrape.append(scrape_output.hash)
 
-async def evaluate_job_listings(job: Job, session: AsyncSession):
-    """Evaluate listings for a specific job using its template criteria."""
-    listing_scores = await get_job_listing_scores(job.id)
+                if len(upsert_listings) >= BATCH_SIZE or len(listing_hashes_from_scrape) >= MEMOIZED_BATCH_SIZE:
+                    await _flush()
+
+            await _flush()
+        finally:
+            # Time not spent writing is time spent in the browser
+            scrape_stats.listings_rejected = scraper.rejected_count
+            scrape_stats.stage_seconds['scrape'] = time.monotonic() - started - scrape_stats.stage_seconds['db_write']
+            for stats in stats_by_job.values():
+                stats.absorb_scrape(scrape_stats)
+
+    return enqueued_ids
+
+async def evaluate_job_listings(job: Job, session: AsyncSession, listing_ids: Optional[List[UUID]] = None, stats: Optional[JobRunStats] = None):
+    """Evaluate listings for a specific job using its template criteria, counting outcomes into `stats` if given."""
+    stats = stats or JobRunStats()
+    listing_scores = await get_job_listing_scores(job.id, listing_ids)
     
     print(f"\033[33mEvaluating listings for job: {job.name}")
     print(f"Found {len(listing_scores)} listings to evaluate\033[0m")
     
     for score in listing_scores:
-        if score.score == 0:
+        if score.score == 0 or score.needs_reevaluation:
+            if not fair_scheduler.within_budget("tokens", job.user_id):
+                # Remaining listings stay pending and are picked up by a later run
+                print(f"Daily token budget exhausted for user {job.user_id}, deferring evaluation")
+                break
             try:
                 listing = await get_listing_by_id(score.listing_id)
                 if not listing:
                     print(f"Listing {score.listing_id} not found for evaluation.")
                     continue
 
-                hueristic_score, hueristic_trace = evaluate_listing_hueristics(listing)
-                aesthetic_score, aesthetic_trace = evaluate_listing_aesthetics(listing)
-                total_score = hueristic_score + aesthetic_score
+                hueristic_components, hueristic_trace = evaluate_listing_hueristic_components(listing)
+                if not score.needs_reevaluation and (reused := await get_reusable_evaluation(listing, job.id)):
+                    print(f"Reusing evaluation of canonical listing {reused.listing_id} for repost {listing.id}")
+                    aesthetic_score, aesthetic_trace = reused.aesthetic_score, reused.aesthetic_trace
+                    stats.evaluations_cached += 1
+                else:
+                    aesthetic_score, aesthetic_trace, tokens_used = evaluate_listing_aesthetics(listing)
+                    fair_scheduler.record_usage("tokens", job.user_id, tokens_used)
+                    stats.tokens_used += tokens_used
+                total_score = sum(hueristic_components.values()) + aesthetic_score
                 total_trace = f"{hueristic_trace} | {aesthetic_trace}"
                 
-                await update_job_listing_score(job.id, listing.id, total_score, total_trace)
+                await update_job_listing_score(job.id, listing.id, total_score, total_trace, components={
+                    **hueristic_components,
+                    'aesthetic_score': aesthetic_score,
+                    'heuristic_trace': hueristic_trace,
+                    'aesthetic_trace': aesthetic_trace
+                })
+                await publish_job_listing(job.id, listing.id, "listing_scored")
+                stats.evaluations_done += 1
                 
             except Exception as e:
                 print(f"Error evaluating listing {score.listing_id}: {str(e)}")
+                stats.evaluations_failed += 1
                 continue
 
+async def schedule_next_run(job: Job, stats: JobRunStats) -> None:
+    """Complete the run and pick the next refresh time from the new-listing rate, result churn and user activity."""
+    now = datetime.now()
+    new_listing_rate = smoothed_new_listing_rate(stats.new_links, job.updated_at, job.new_listing_rate, now)
+    churn = (stats.new_links + stats.changed_listings) / max(await count_job_listings(job.id), 1)
+    next_run_at = compute_next_run_at(now, new_listing_rate, churn, job.last_viewed_at, job.created_at)
+    print(f"Job {job.id}: {new_listing_rate:.1f} new listings/day, churn {churn:.2f}, next run at {next_run_at}")
+    await complete_job_run(job.id, next_run_at, new_listing_rate)
+
 # def async_task(app=None, *args, **kwargs):
 #     """Decorator to properly handle async tasks with Celery."""
 #     def decorator(func):
@@ -106,26 +319,167 @@ async def evaluate_job_listings(job: Job, session: AsyncSession):
 #     return decorator
 
 
+def _run_job_group(task, job_ids: List[UUID]):
+    """Scrape once for jobs sharing a search, fanning evaluation out to the evaluate queue per job."""
+    async def _run_jobs():
+        async with get_async_db() as session:
+            jobs = []
+            for job_id in job_ids:
+                job = await session.get(Job, job_id)
+                if not job:
+                    print(f"ERROR: Job {job_id} not found")
+                    continue
+                jobs.append(job)
+            if not jobs:
+                raise ValueError(f"Jobs {job_ids} not found")
+
+            # Waiting for a slot and then running can outlast the lease taken at claim time, so renew it
+            # on every attempt; otherwise the dispatcher would claim these jobs again while they wait or run
+            await extend_job_leases(job_ids)
+            # Every owner in the group takes one of their own scrape slots, so one owner's cap only holds back their jobs
+            slot_ids = {}
+            for owner_id in dict.fromkeys(job.user_id for job in jobs):
+                if (slot_id := fair_scheduler.acquire_scrape_slot(owner_id)):
+                    slot_ids[owner_id] = slot_id
+            deferred_ids = [job.id for job in jobs if job.user_id not in slot_ids]
+            if len(deferred_ids) == len(jobs):
+                print(f"Owners of jobs {job_ids} are at their concurrent scrape limit, deferring")
+                return False
+            if deferred_ids:
+                print(f"Owners of jobs {deferred_ids} are at their concurrent scrape limit, deferring them to their own run")
+                run_job_group.apply_async(args=[deferred_ids], countdown=SCRAPE_SLOT_RETRY_SECONDS)
+                jobs = [job for job in jobs if job.user_id in slot_ids]
+            run_ids = await start_job_runs([job.id for job in jobs])
+            stats_by_job = {job.id: JobRunStats() for job in jobs}
+            status = 'failed'
+            try:
+                await _scrape_and_schedule(jobs, session, stats_by_job, run_ids)
+                status = 'completed'
+            finally:
+                for owner_id, slot_id in slot_ids.items():
+                    fair_scheduler.release_scrape_slot(owner_id, slot_id)
+                for job_id, run_id in run_ids.items():
+                    await finish_job_run(run_id, status, stats_by_job[job_id].scrape_counters())
+                    JOB_RUNS.labels(status).inc()
+                # The group shared one scrape, so its stages are observed once
+                for stage, seconds in stats_by_job[jobs[0].id].stage_seconds.items():
+                    JOB_STAGE_SECONDS.labels(stage).observe(seconds)
+            return True
+
+    async def _scrape_and_schedule(jobs: List[Job], session: AsyncSession, stats_by_job: Dict[UUID, JobRunStats], run_ids: Dict[UUID, UUID]):
+        print(f"Running scrape listings for jobs {job_ids}")
+        for job in jobs:
+            publish_job_event(job.id, "stage", {"stage": "scraping"})
+        enqueued_by_job = await scrape_listings(jobs, session, stats_by_job, run_ids)
+
+        for job in jobs:
+            # Pick up listings linked by earlier runs but never evaluated, or flagged after an edit
+            enqueued_ids = enqueued_by_job[job.id]
+            pending_ids = [li for li in await get_pending_evaluation_listing_ids(job.id) if li not in enqueued_ids]
+            enqueue_evaluations(job, pending_ids, run_ids[job.id])
+            await schedule_next_run(job, stats_by_job[job.id])
+
+            if enqueued_ids or pending_ids:
+                print(f"Queued {len(enqueued_ids) + len(pending_ids)} listings for evaluation for job {job.id}")
+                publish_job_event(job.id, "stage", {"stage": "evaluating"})
+            else:
+                publish_job_event(job.id, "stage", {"stage": "done"})
+        await clear_job_checkpoint(jobs[0].id)
+
+    try:
+        started = runtime.run(_run_jobs())
+    except Exception:
+        for job_id in job_ids:
+            publish_job_event(job_id, "stage", {"stage": "failed"})
+        raise
+    if not started:
+        raise task.retry(countdown=SCRAPE_SLOT_RETRY_SECONDS, max_retries=SCRAPE_SLOT_MAX_RETRIES)
+
 # @async_task(app=celery, bind=True, max_retries=1)
 @celery.task(bind=True, max_retries=1)
 def run_single_job(self, job_id: UUID):
-    """Run a complete job cycle - scraping and evaluation."""
-    import asyncio
-    
-    async def _run_job():
+    """Run a job cycle: scrape on the scrape queue, fanning evaluation out to the evaluate queue."""
+    _run_job_group(self, [job_id])
+
+@celery.task(bind=True, max_retries=1)
+def run_job_group(self, job_ids: List[UUID]):
+    """Run one job cycle for several jobs with the same search, scraping only once."""
+    _run_job_group(self, job_ids)
+
+@celery.task(bind=True, max_retries=1, time_limit=10 * 60)
+def evaluate_listings(
+    self, job_id: UUID, listing_ids: List[UUID], user_id: Optional[str] = None, slot_id: Optional[str] = None, run_id: Optional[str] = None
+):
+    """Evaluate a batch of a job's listings on the evaluate queue, dispatched by the fair scheduler."""
+    job_id = UUID(str(job_id))
+    listing_ids = [UUID(str(listing_id)) for listing_id in listing_ids]
+
+    async def _evaluate():
+        stats = JobRunStats()
+        started = time.monotonic()
         async with get_async_db() as session:
             job = await session.get(Job, job_id)
             if not job:
                 print(f"ERROR: Job {job_id} not found")
                 raise ValueError(f"Job {job_id} not found")
-            
-            print(f"Running scrape listings for job {job_id}")
-            await scrape_listings(job, session)
-            
-            print(f"Running evaluate job listings for job {job_id}")
-            await evaluate_job_listings(job, session)
+            await evaluate_job_listings(job, session, listing_ids, stats)
+
+        elapsed = time.monotonic() - started
+        JOB_STAGE_SECONDS.labels('evaluation').observe(elapsed)
+        EVALUATIONS.labels('done').inc(stats.evaluations_done)
+        EVALUATIONS.labels('failed').inc(stats.evaluations_failed)
+        EVALUATIONS.labels('cached').inc(stats.evaluations_cached)
+
+        finished = not await get_pending_evaluation_listing_ids(job_id)
+        if run_id:
+            await record_job_run_evaluations(
+                UUID(run_id), stats.evaluations_done, stats.evaluations_failed, stats.evaluations_cached,
+                stats.tokens_used, elapsed, finished
+            )
+        if finished:
+            publish_job_event(job_id, "stage", {"stage": "done"})
+
+    try:
+        runtime.run(_evaluate())
+    finally:
+        if slot_id:
+            fair_scheduler.release_evaluation_slot(user_id, slot_id)
+            fair_scheduler.dispatch_evaluations()
+
+@celery.task
+def sweep_stale_listings():
+    """Check a batch of listings for deletion or expiry with plain HTTP requests and archive dead ones."""
+    async def _sweep():
+        due_listings = await get_listings_due_for_liveness_check(LIVENESS_BATCH_SIZE)
+        if not due_listings:
+            return
+        results = await check_listings_live(due_listings, LIVENESS_CONCURRENCY, runtime.http_client)
+        live_ids = [listing_id for listing_id, live in results.items() if live is True]
+        dead_ids = [listing_id for listing_id, live in results.items() if live is False]
+        await record_liveness_results(live_ids, dead_ids)
+        print(f"Liveness sweep checked {len(due_listings)} listings: {len(dead_ids)} dead, {len(due_listings) - len(live_ids) - len(dead_ids)} inconclusive")
+
+    runtime.run(_sweep())
+
+@celery.task
+def backfill_listing_fingerprints(after_id: Optional[str] = None):
+    """Fingerprint listings stored before repost detection, one batch per task, so reposts of them are caught."""
+    async def _backfill() -> Optional[UUID]:
+        listings = await get_listings_missing_fingerprints(UUID(after_id) if after_id else None, FINGERPRINT_BACKFILL_BATCH_SIZE)
+        for listing in listings:
+            simhash = listing.description_simhash
+            if simhash is None:
+                simhash = description_simhash(listing.description)
+            dhash = listing.image_dhash
+            if dhash is None and listing.image_urls:
+                dhash = await asyncio.to_thread(image_dhash, listing.image_urls[0])
+            await save_listing_fingerprints(listing.id, simhash, dhash)
+        print(f"Fingerprinted {len(listings)} listings")
+        return listings[-1].id if len(listings) == FINGERPRINT_BACKFILL_BATCH_SIZE else None
 
-    asyncio.run(_run_job())
+    # Listings that still get no bands (no description, no images) are walked past by ID, so the chain ends
+    if (last_id := runtime.run(_backfill())):
+        backfill_listing_fingerprints.delay(str(last_id))
 
 async def test_just_evaluation(job_id: UUID):
     async with get_async_db() as session:
@@ -1,25 +1,39 @@
 # Basic structure for app/main.py
-from asyncio import Lock
-from fastapi import BackgroundTasks, FastAPI, HTTPException, Depends
+import asyncio
+import time
+import orjson
+from brotli_asgi import BrotliMiddleware
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Depends, Query, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from app.logic import run_single_job, test_just_evaluation
+from app.logic import run_job_group, run_single_job, sweep_stale_listings, test_just_evaluation
+from app.core.base_scraper import ScrapingConfig
 from app.services.authentication import ACCESS_TOKEN_EXPIRE_MINUTES, SECRET_KEY, router as auth_router, get_current_user, send_invitation_email_stub
 from pydantic import BaseModel
-from typing import Dict, Optional, List
+from typing import Dict, Literal, Optional, List
 from datetime import datetime
 from sqlalchemy import text
 from app.db.database import (
-    engine, get_next_pending_job, get_user_jobs, get_job_with_listings, 
+    engine, claim_due_jobs, get_user_jobs, get_job_with_listings, 
     create_job_template, create_job,
-    get_user_by_email, create_invited_user, add_user_to_job_access, get_job_by_id
+    get_user_by_email, create_invited_user, add_user_to_job_access, get_job_by_id, check_job_access,
+    record_job_view, get_job_runs, get_job_listing_detail, stream_job_listings, JOB_VIEW_RECORD_INTERVAL_MINUTES
 )
+from app.services.events import stream_job_events
+from app.services.export import EXPORT_FORMATS
+from app.services.fair_scheduler import dispatch_evaluations
+from app.services.metrics import HTTP_REQUEST_SECONDS, render_metrics
+from app.services import response_cache
+from app.services.tracing import configure_tracing, shutdown_tracing, tracer
+from opentelemetry import propagate, trace
 from app.models.models import User
 from starlette.middleware.sessions import SessionMiddleware
 from uuid import UUID
 from functools import wraps
 
-from app.config import FRONTEND_URL
+from app.config import FRONTEND_URL, DISPATCH_BATCH_SIZE, NO_IMAGE_URL, BROTLI_QUALITY, RESPONSE_COMPRESSION_MIN_BYTES
+from celery import group
 import httpx
 class JobInput(BaseModel):
     name: str
@@ -41,6 +55,9 @@ class JobStubOutput(BaseModel):
     last_updated: datetime
     listing_count: int
     cover_image_url: str
+    evaluated_count: int = 0
+    top_score: Optional[float] = None
+    last_new_listing_at: Optional[datetime] = None
 
 class ListingOutput(BaseModel):
     id: UUID
@@ -52,10 +69,69 @@ class ListingOutput(BaseModel):
     bathrooms: float
     square_footage: int
     score: float
-    trace: str
     link: str
+    price_score: Optional[float] = None
+    size_score: Optional[float] = None
+    bedrooms_score: Optional[float] = None
+    bathrooms_score: Optional[float] = None
+    aesthetic_score: Optional[float] = None
 
-app = FastAPI()
+class ListingDetailOutput(ListingOutput):
+    description: Optional[str] = None
+    trace: Optional[str] = None
+    heuristic_trace: Optional[str] = None
+    aesthetic_trace: Optional[str] = None
+
+class ListingFilters(BaseModel):
+    """Optional server-side filters on a job's listings."""
+    min_price: Optional[int] = None
+    max_price: Optional[int] = None
+    min_bedrooms: Optional[int] = None
+    min_bathrooms: Optional[float] = None
+    min_square_footage: Optional[int] = None
+    min_score: Optional[float] = None
+
+    def to_filters(self) -> Dict[str, float]:
+        return {name: value for name, value in self.model_dump().items() if value is not None}
+
+class JobRunOutput(BaseModel):
+    model_config = {"from_attributes": True}
+
+    id: UUID
+    status: str
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    evaluated_at: Optional[datetime] = None
+    pages_loaded: int
+    listings_new: int
+    listings_known: int
+    listings_rejected: int
+    listings_linked: int
+    evaluations_done: int
+    evaluations_failed: int
+    evaluations_cached: int
+    tokens_used: int
+    scrape_seconds: float
+    db_write_seconds: float
+    evaluation_seconds: float
+
+class ScoreWeights(BaseModel):
+    """Optional per-component weights used to re-rank a job's listings at query time."""
+    price_weight: Optional[float] = None
+    size_weight: Optional[float] = None
+    bedrooms_weight: Optional[float] = None
+    bathrooms_weight: Optional[float] = None
+    aesthetic_weight: Optional[float] = None
+
+    def to_component_weights(self) -> Optional[Dict[str, float]]:
+        provided = {
+            field.removesuffix('_weight') + '_score': weight
+            for field, weight in self.model_dump().items() if weight is not None
+        }
+        return provided or None
+
+configure_tracing('web')
+app = FastAPI(default_response_class=ORJSONResponse)
 app.include_router(auth_router, prefix="/auth", tags=["authentication"])
 scheduler = AsyncIOScheduler(
     job_defaults={
@@ -70,6 +146,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
+)
+
+# Brotli for clients that accept it, gzip otherwise. Event streams are left alone so events aren't held in the
+# compressor, and exports because Parquet is already compressed.
+app.add_middleware(
+    BrotliMiddleware,
+    quality=BROTLI_QUALITY,
+    minimum_size=RESPONSE_COMPRESSION_MIN_BYTES,
+    gzip_fallback=True,
+    excluded_handlers=[r"^/jobs/[^/]+/events$", r"^/jobs/[^/]+/export$"],
 )
 
 app.add_middleware(
@@ -78,6 +165,31 @@ app.add_middleware(
         max_age=ACCESS_TOKEN_EXPIRE_MINUTES * 60
 )
 
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    # Continues a trace started by the caller, if any; spans opened while handling nest under this one
+    with tracer.start_as_current_span(
+        f"{request.method} {request.url.path}", context=propagate.extract(request.headers), kind=trace.SpanKind.SERVER
+    ) as span:
+        response = await call_next(request)
+        if (route := request.scope.get("route")):
+            span.update_name(f"{request.method} {route.path}")
+        span.set_attribute("http.status_code", response.status_code)
+        return response
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    # Labelled by route template rather than raw path so job IDs don't explode the series count
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.labels(request.method, route.path if route else "unmatched", status).observe(time.perf_counter() - started)
+
 @app.on_event("startup")
 async def startup_event():
     scheduler.start()
@@ -85,6 +197,7 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     scheduler.shutdown()
+    shutdown_tracing()
 
 def scheduled_task(interval_minutes: int):
     def decorator(func):
@@ -97,14 +210,26 @@ def scheduled_task(interval_minutes: int):
         return wrapper
     return decorator
 
-_job_lock = Lock()
-
 @scheduled_task(interval_minutes=1)
 async def run_scheduled_jobs_async():
-    if not _job_lock.locked():
-        async with _job_lock:
-            if (pending_job := await get_next_pending_job()):
-                run_single_job.delay(pending_job.id)
+    # Claims are leased in the database, so this is safe to run on every web replica
+    while (jobs := await claim_due_jobs(DISPATCH_BATCH_SIZE)):
+        # Jobs with the same search share one scrape; only evaluation stays per job
+        jobs_by_search = {}
+        for job in jobs:
+            jobs_by_search.setdefault(ScrapingConfig.from_job_template(job.template).search_key(), []).append(job.id)
+        group(run_job_group.s(job_ids) for job_ids in jobs_by_search.values()).apply_async()
+        if len(jobs) < DISPATCH_BATCH_SIZE:
+            break
+
+@scheduled_task(interval_minutes=15)
+async def run_liveness_sweep_async():
+    sweep_stale_listings.delay()
+
+@scheduled_task(interval_minutes=1)
+async def run_evaluation_dispatch_async():
+    # Evaluate tasks dispatch on completion; this catches backlogs left behind by expired slots
+    await asyncio.to_thread(dispatch_evaluations)
 
 @app.get("/test-evaluation")
 async def run_test_evaluation():
@@ -123,32 +248,148 @@ async def run_test_evaluation():
 async def root():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+async def _record_job_view(job_id: UUID) -> None:
+    # Polling clients hit this on every request, including cache hits and 304s, so Redis gates the write
+    if await response_cache.claim_job_view(job_id, JOB_VIEW_RECORD_INTERVAL_MINUTES * 60):
+        await record_job_view(job_id)
+
+def _cached_json_response(request: Request, etag: Optional[str], body: bytes, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serve a JSON body with its ETag, or 304 when the client already has it. Clients must revalidate every time."""
+    headers = {**(headers or {}), "Cache-Control": "private, no-cache"}
+    if etag:
+        headers["ETag"] = etag
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
 @app.get("/jobs", response_model=List[JobStubOutput])
-async def get_job_ids(current_user: User = Depends(get_current_user)):
+async def get_job_ids(request: Request, current_user: User = Depends(get_current_user)):
     """Get all job IDs for the current user"""
-    jobs = await get_user_jobs(current_user.id)
-    job_stubs = [
-        JobStubOutput(
-            id=job.id,
-            name=job.name,
-            last_updated=job.updated_at or job.created_at,
-            listing_count=listing_count,
-            cover_image_url=cover_image_url
-        ) for job, listing_count, cover_image_url in jobs
-    ]
-    return job_stubs
+    etag, body, cached_job_ids = await response_cache.get_user_jobs_response(current_user.id)
+    if body is None:
+        # Versions are read before the query, so a write landing during it invalidates what gets cached
+        etag = await response_cache.user_jobs_etag(current_user.id, cached_job_ids)
+        jobs = await get_user_jobs(current_user.id)
+        job_stubs = [
+            JobStubOutput(
+                id=job.id,
+                name=job.name,
+                last_updated=job.updated_at or job.created_at,
+                listing_count=summary.listing_count if summary else 0,
+                cover_image_url=(summary.cover_image_url if summary else None) or NO_IMAGE_URL,
+                evaluated_count=summary.evaluated_count if summary else 0,
+                top_score=summary.top_score if summary else None,
+                last_new_listing_at=summary.last_new_listing_at if summary else None
+            ) for job, summary in jobs
+        ]
+        body = orjson.dumps([stub.model_dump() for stub in job_stubs])
+        job_ids = [str(stub.id) for stub in job_stubs]
+        await response_cache.set_user_jobs_response(current_user.id, etag, job_ids, body)
+        if job_ids != cached_job_ids:
+            # The ETag was read for a different set of jobs, so it can't validate this body
+            etag = None
+    return _cached_json_response(request, etag, body)
 
 @app.get("/jobs/{job_id}", response_model=List[ListingOutput])
-async def get_job(job_id: UUID, current_user: User = Depends(get_current_user)):
-    """Get all scored listings for a specific job"""
-    listings = await get_job_with_listings(job_id, current_user.id)
-    if listings is None:
+async def get_job(
+    request: Request,
+    job_id: UUID,
+    weights: ScoreWeights = Depends(),
+    filters: ListingFilters = Depends(),
+    sort: Literal['score', 'price', 'price_desc', 'square_footage', 'newest'] = 'score',
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    fields: Optional[str] = Query(None, description="Comma-separated listing fields to return"),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a page of a job's scored listings, filtered, sorted and optionally re-ranked by score component weights.
+
+    The next page's cursor is returned in the X-Next-Cursor header and is absent on the last page.
+    """
+    selected_fields = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    if selected_fields and (unknown := set(selected_fields) - set(ListingOutput.model_fields)):
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    # Responses are cached per user and query until a worker writes to the job. Access is checked
+    # before anything is cached, so a hit under this user's key implies access.
+    etag = await response_cache.job_listings_etag(current_user.id, job_id, str(sorted(request.query_params.multi_items())))
+    if etag and (cached := await response_cache.get_job_listings_response(etag)):
+        body, next_cursor = cached
+        await _record_job_view(job_id)
+        return _cached_json_response(request, etag, body, {"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+    try:
+        page = await get_job_with_listings(
+            job_id, current_user.id, weights.to_component_weights(), filters.to_filters(),
+            sort, cursor, limit, selected_fields
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page is None:
+        raise HTTPException(status_code=404, detail="Job not found or unauthorized")
+    listings, next_cursor = page
+    await _record_job_view(job_id)
+    # Rows come straight from our own query, so they're serialized as-is rather than re-validated against ListingOutput
+    body = orjson.dumps(listings)
+    if etag:
+        await response_cache.set_job_listings_response(etag, body, next_cursor)
+    return _cached_json_response(request, etag, body, {"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+@app.get("/jobs/{job_id}/export")
+async def export_job(
+    job_id: UUID,
+    format: Literal['csv', 'ndjson', 'parquet'] = 'csv',
+    weights: ScoreWeights = Depends(),
+    filters: ListingFilters = Depends(),
+    current_user: User = Depends(get_current_user)
+):
+    """Download all of a job's ranked listings as CSV, NDJSON or Parquet, streamed as they are read"""
+    if not await check_job_access(job_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Job not found or unauthorized")
+    media_type, extension, chunks = EXPORT_FORMATS[format]
+    rows = stream_job_listings(job_id, weights.to_component_weights(), filters.to_filters())
+    return StreamingResponse(
+        chunks(rows),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="job-{job_id}.{extension}"'}
+    )
+
+@app.get("/jobs/{job_id}/events")
+async def get_job_events(job_id: UUID, request: Request, current_user: User = Depends(get_current_user)):
+    """Stream a job's stage progress and newly scraped/scored listings as Server-Sent Events"""
+    if not await check_job_access(job_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Job not found or unauthorized")
+    await _record_job_view(job_id)
+    return StreamingResponse(
+        stream_job_events(job_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/jobs/{job_id}/listings/{listing_id}", response_model=ListingDetailOutput)
+async def get_job_listing_details(job_id: UUID, listing_id: UUID, current_user: User = Depends(get_current_user)):
+    """Get one of a job's listings with its description and the reasoning behind its score"""
+    if not await check_job_access(job_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Job not found or unauthorized")
+    listing = await get_job_listing_detail(job_id, listing_id)
+    if not listing:
+        raise HTTPException(status_code=404, detail="Listing not found")
+    return ORJSONResponse(listing)
+
+@app.get("/jobs/{job_id}/runs", response_model=List[JobRunOutput])
+async def get_job_run_history(job_id: UUID, since: Optional[datetime] = None, limit: int = Query(50, ge=1, le=500), current_user: User = Depends(get_current_user)):
+    """Get a job's recent runs with per-stage timings, throughput and evaluation cost, newest first"""
+    if not await check_job_access(job_id, current_user.id):
         raise HTTPException(status_code=404, detail="Job not found or unauthorized")
-    return listings
+    return await get_job_runs(job_id, since, limit)
 
 @app.post("/jobs/add")
 async def add_job(job_input: JobInput, current_user: User = Depends(get_current_user)):
@@ -1,9 +1,10 @@
 from datetime import datetime
-from sqlalchemy import Boolean, create_engine, Column, Integer, String, Float, DateTime, ForeignKey, JSON, Table
+from sqlalchemy import BigInteger, Boolean, create_engine, Column, Index, Integer, String, Float, DateTime, ForeignKey, ForeignKeyConstraint, JSON, Table, Text
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 import uuid
 
 from app.config import DATABASE_URL
@@ -32,18 +33,43 @@ class JobTemplate(Base):
     search_distance_miles = Column(Float, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+def _trace_proxy(column: str):
+    return association_proxy('traces', column, creator=lambda value: JobListingTrace(**{column: value}))
+
 class JobListingScore(Base):
     __tablename__ = 'job_listing_scores'
     
     job_id = Column(UUID(as_uuid=True), ForeignKey('jobs.id'), primary_key=True)
     listing_id = Column(UUID(as_uuid=True), ForeignKey('listings.id'), primary_key=True)
     score = Column(Float, nullable=False, default=0)
-    trace = Column(String, nullable=True)
+    # Score components, stored separately so they can be re-weighted without re-evaluating
+    price_score = Column(Float, nullable=True)
+    size_score = Column(Float, nullable=True)
+    bedrooms_score = Column(Float, nullable=True)
+    bathrooms_score = Column(Float, nullable=True)
+    aesthetic_score = Column(Float, nullable=True)
+    needs_reevaluation = Column(Boolean, nullable=False, default=False, server_default='false')  # Set when the listing's photos or description change
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     job = relationship("Job", back_populates="listing_scores")
 
+    # Traces live in job_listing_traces so rankings and summaries scan narrow rows. They are never
+    # loaded implicitly: queries that read them add selectinload(JobListingScore.traces).
+    traces = relationship("JobListingTrace", uselist=False, lazy="raise", cascade="all, delete-orphan", passive_deletes=True)
+    trace = _trace_proxy('trace')
+    heuristic_trace = _trace_proxy('heuristic_trace')
+    aesthetic_trace = _trace_proxy('aesthetic_trace')
+
+    # Keyset pagination of a job's listings walks these in either direction
+    __table_args__ = (
+        Index('ix_job_listing_scores_job_score', 'job_id', 'score', 'listing_id'),
+        Index('ix_job_listing_scores_job_created', 'job_id', 'created_at', 'listing_id'),
+        Index('ix_job_listing_scores_listing_id', 'listing_id'),
+        # Scores still waiting for an evaluation
+        Index('ix_job_listing_scores_pending', 'job_id', postgresql_where=text('score = 0 OR needs_reevaluation')),
+    )
+
 class Job(Base):
     __tablename__ = 'jobs'
     
@@ -53,6 +79,10 @@ class Job(Base):
     name = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)  # Set while a dispatcher has claimed the job
+    next_run_at = Column(DateTime(timezone=True), nullable=True, index=True)  # Computed by the adaptive refresh policy
+    last_viewed_at = Column(DateTime(timezone=True), nullable=True)
+    new_listing_rate = Column(Float, nullable=True)  # Smoothed new listings per day
     
     template = relationship("JobTemplate", lazy="joined")
     user = relationship("User", back_populates="owned_jobs", lazy="selectin") # Owner relationship
@@ -61,6 +91,11 @@ class Job(Base):
     # New relationships for invitations and shared access
     shared_with_users = relationship("User", secondary=job_access, back_populates="accessible_jobs", lazy="selectin") # Jobs shared with this user
 
+    # Dashboard: jobs a user owns, most recently updated first
+    __table_args__ = (
+        Index('ix_jobs_user_updated', 'user_id', 'updated_at'),
+    )
+
 class Listing(Base):
     __tablename__ = 'listings'
 
@@ -71,18 +106,133 @@ class Listing(Base):
     bathrooms = Column(Float)
     square_footage = Column(Integer)
     post_id = Column(String, unique=True)
-    description = Column(String)
     price = Column(Integer)
     location = Column(String)
     neighborhood = Column(String)
-    image_urls = Column(String)  # Stored as JSON string array
+    image_urls = Column(JSONB, nullable=True)  # List of image URLs in page order
+    cover_image_url = Column(String, nullable=True)  # First of image_urls, so list views don't load the whole list
     link = Column(String)
+    description_simhash = Column(BigInteger, nullable=True)
+    image_dhash = Column(BigInteger, nullable=True)  # Perceptual hash of the cover image
+    canonical_listing_id = Column(UUID(as_uuid=True), ForeignKey('listings.id'), nullable=True, index=True)  # Set when this post is a repost
+    content_fingerprint = Column(String, nullable=True)  # Hash of the fields tracked in listing_history
+    last_scraped_at = Column(DateTime(timezone=True), server_default=func.now())
+    is_live = Column(Boolean, nullable=False, default=True, server_default='true', index=True)  # False once the post is deleted or expired
+    liveness_checked_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # Liveness sweep: live listings, least recently checked first
+        Index('ix_listings_liveness_due', text('liveness_checked_at NULLS FIRST'), postgresql_where=text('is_live')),
+        Index('ix_listings_last_scraped_at', 'last_scraped_at'),
+    )
+
+    # The description lives in listing_details and is only loaded by queries that add selectinload(Listing.details)
+    details = relationship("ListingDetail", uselist=False, lazy="raise", cascade="all, delete-orphan", passive_deletes=True)
+    description = association_proxy('details', 'description', creator=lambda description: ListingDetail(description=description))
+
     def __repr__(self):
         return f"<Listing(title='{self.title}', price=${self.price}, {self.bedrooms}BR/{self.bathrooms}BA, location='{self.location}', neighborhood='{self.neighborhood}')>"
     
+class JobCheckpoint(Base):
+    """Progress of an in-flight job run, so a retried or resumed task continues where it stopped."""
+    __tablename__ = 'job_checkpoints'
+
+    job_id = Column(UUID(as_uuid=True), ForeignKey('jobs.id'), primary_key=True)
+    state = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class JobSummary(Base):
+    """Dashboard figures of a job, maintained as scores are written instead of aggregated per request."""
+    __tablename__ = 'job_summaries'
+
+    job_id = Column(UUID(as_uuid=True), ForeignKey('jobs.id'), primary_key=True)
+    listing_count = Column(Integer, nullable=False, default=0)  # Live listings linked to the job
+    evaluated_count = Column(Integer, nullable=False, default=0)  # Of those, listings with a non-zero score
+    top_score = Column(Float, nullable=True)
+    top_listing_id = Column(UUID(as_uuid=True), nullable=True)
+    cover_image_url = Column(String, nullable=True)  # First image of the top listing
+    last_new_listing_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class JobRun(Base):
+    """One run of a job: what the scrape saw, what evaluation cost and where the time went.
+
+    Jobs sharing a search share one scrape, so each of their runs carries the same page and listing counts.
+    Evaluation counters are added by the evaluate tasks the run queued, after the scrape has finished.
+    """
+    __tablename__ = 'job_runs'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id = Column(UUID(as_uuid=True), ForeignKey('jobs.id'), nullable=False)
+    status = Column(String, nullable=False, default='running')  # running, completed or failed
+    started_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)  # End of the scrape stage
+    evaluated_at = Column(DateTime(timezone=True), nullable=True)  # When the last queued evaluation finished
+
+    pages_loaded = Column(Integer, nullable=False, default=0)
+    listings_new = Column(Integer, nullable=False, default=0)  # Scraped for the first time
+    listings_known = Column(Integer, nullable=False, default=0)  # Already stored, matched by hash
+    listings_rejected = Column(Integer, nullable=False, default=0)  # Scraped but failed validation
+    listings_linked = Column(Integer, nullable=False, default=0)  # Newly added to this job
+    evaluations_done = Column(Integer, nullable=False, default=0)
+    evaluations_failed = Column(Integer, nullable=False, default=0)
+    evaluations_cached = Column(Integer, nullable=False, default=0)  # Reused from a repost's canonical listing
+    tokens_used = Column(Integer, nullable=False, default=0)
+
+    scrape_seconds = Column(Float, nullable=False, default=0)
+    db_write_seconds = Column(Float, nullable=False, default=0)
+    evaluation_seconds = Column(Float, nullable=False, default=0)  # Summed across evaluate tasks
+
+    __table_args__ = (
+        Index('ix_job_runs_job_started', 'job_id', 'started_at'),
+    )
+
+class ListingDetail(Base):
+    """Bulky listing text, kept off the listings rows that list views and scans read."""
+    __tablename__ = 'listing_details'
+
+    listing_id = Column(UUID(as_uuid=True), ForeignKey('listings.id', ondelete='CASCADE'), primary_key=True)
+    description = Column(Text, nullable=True)
+
+class JobListingTrace(Base):
+    """Reasoning traces behind a job listing score, shown only in the listing detail view."""
+    __tablename__ = 'job_listing_traces'
+
+    job_id = Column(UUID(as_uuid=True), primary_key=True)
+    listing_id = Column(UUID(as_uuid=True), primary_key=True)
+    trace = Column(Text, nullable=True)
+    heuristic_trace = Column(Text, nullable=True)
+    aesthetic_trace = Column(Text, nullable=True)
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ['job_id', 'listing_id'], ['job_listing_scores.job_id', 'job_listing_scores.listing_id'], ondelete='CASCADE'
+        ),
+    )
+
+class ListingHistory(Base):
+    """Field-level change log for listings, recorded when a listing is rescraped."""
+    __tablename__ = 'listing_history'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    listing_id = Column(UUID(as_uuid=True), ForeignKey('listings.id'), nullable=False, index=True)
+    field = Column(String, nullable=False)
+    old_value = Column(String, nullable=True)
+    new_value = Column(String, nullable=True)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ListingFingerprintBand(Base):
+    """Banded similarity index over listing hashes, used to find repost candidates with exact lookups."""
+    __tablename__ = 'listing_fingerprint_bands'
+
+    kind = Column(String, primary_key=True)  # 'description' or 'image'
+    band = Column(Integer, primary_key=True)
+    value = Column(Integer, primary_key=True)
+    listing_id = Column(UUID(as_uuid=True), ForeignKey('listings.id', ondelete='CASCADE'), primary_key=True)
+
 class VerificationCode(Base):
     __tablename__ = "verification_codes"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -92,12 +242,17 @@ class VerificationCode(Base):
     expires_at = Column(DateTime)
     used = Column(Boolean, default=False)
 
+    __table_args__ = (
+        Index('ix_verification_codes_unused', 'email', 'code', 'created_at', postgresql_where=text('NOT used')),
+    )
+
 class User(Base):
     __tablename__ = "users"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, index=True)
     is_active = Column(Boolean, default=True)
     account_status = Column(String, nullable=False, default='active', server_default='active') # This should be present
+    scheduling_weight = Column(Float, nullable=False, default=1.0, server_default='1')  # Share of scrape/evaluation capacity in fair scheduling
 
     # Relationships
     owned_jobs = relationship("Job", back_populates="user") # Jobs this user owns
@@ -2,12 +2,14 @@
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Cookie
 from fastapi.security import OAuth2PasswordBearer
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
+from uuid import UUID
 from pydantic import BaseModel, EmailStr
 from sqlalchemy import select, update
 from app.models.models import User, VerificationCode
 import jwt
 import secrets
+import time
 from email.message import EmailMessage
 import aiosmtplib
 from app.db.database import get_async_db
@@ -23,6 +25,10 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 EMAIL_VERIFICATION_TOKEN_EXPIRE_MINUTES = 60
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
+# Resolved users are cached per process by ID so authenticated requests skip the users table
+USER_CACHE_TTL_SECONDS = 60
+USER_CACHE_MAX_ENTRIES = 10000
+_user_cache: Dict[UUID, Tuple[User, float]] = {}
 
 # Email settings
 SMTP_HOST = os.getenv("SMTP_HOST")
@@ -98,6 +104,15 @@ async def send_invitation_email_stub(to_email: str, job_name: str, invited_by_em
     finally:
         await smtp.quit()
 
+def invalidate_cached_user(user_id: UUID) -> None:
+    """Drop a user from this process's cache after their account status changes."""
+    _user_cache.pop(user_id, None)
+
+def _cache_user(user: User) -> None:
+    if len(_user_cache) >= USER_CACHE_MAX_ENTRIES:
+        _user_cache.clear()
+    _user_cache[user.id] = (user, time.monotonic() + USER_CACHE_TTL_SECONDS)
+
 # Generate verification code
 def generate_verification_code():
     return secrets.token_hex(3)  # 6 character code
@@ -162,13 +177,19 @@ async def verify_code(verify_data: VerifyCode):
         user = result.scalar_one_or_none()
         
         if not user:
-            new_user = User(email=verify_data.email, is_active=True)
-            db.add(new_user)
+            user = User(email=verify_data.email, is_active=True)
+            db.add(user)
+            await db.commit()
+        elif user.account_status == 'invited':
+            # An invited user completes registration by verifying their email
+            user.account_status = 'active'
+            user.is_active = True
             await db.commit()
+            invalidate_cached_user(user.id)
         
-    # Create access token
+    # Create access token; the subject is the user ID so requests resolve the user without a lookup by email
     access_token = create_access_token(
-        data={"sub": verify_data.email},
+        data={"sub": str(user.id), "email": verify_data.email},
         expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     
@@ -206,8 +227,8 @@ async def get_current_user(
             SECRET_KEY, 
             algorithms=[ALGORITHM]
         )
-        email: str = payload.get("sub")
-        if email is None:
+        subject: str = payload.get("sub")
+        if subject is None:
             raise HTTPException(
                 status_code=401, 
                 detail="Invalid token"
@@ -217,10 +238,19 @@ async def get_current_user(
             status_code=401, 
             detail="Invalid token"
         )
+
+    # Tokens issued before the subject became the user ID carry the email instead
+    try:
+        user_id = UUID(subject)
+    except ValueError:
+        user_id = None
+
+    if user_id and (cached := _user_cache.get(user_id)) and cached[1] > time.monotonic():
+        return cached[0]
     
     # Get user from database
     async with get_async_db() as db:
-        user_query = select(User).where(User.email == email)
+        user_query = select(User).where(User.id == user_id) if user_id else select(User).where(User.email == subject)
         result = await db.execute(user_query)
         user = result.scalar_one_or_none()
     
@@ -229,6 +259,7 @@ async def get_current_user(
             status_code=401,
             detail="User not found"
         )
+    _cache_user(user)
     return user
 
 # Protected route example
@@ -2,8 +2,13 @@ import uvloop
 uvloop.install()
 
 from celery import Celery
-from celery.signals import task_failure
+from celery.concurrency import get_implementation
+from celery.concurrency.solo import TaskPool as SoloPool
+from celery.signals import task_failure, worker_init, worker_process_init, worker_process_shutdown, worker_shutdown
 from app.config import REDIS_URL
+from app.services.worker_runtime import runtime
+from app.services.metrics import mark_process_dead, reset_multiproc_dir, start_worker_exporter
+from app.services.tracing import configure_tracing, shutdown_tracing
 
 celery = Celery('tasks', broker=REDIS_URL, backend=REDIS_URL)
 
@@ -14,6 +19,12 @@ celery.conf.update(
     task_reject_on_worker_lost=True,
     imports=['app.logic'],
     worker_pool='solo',
+    # Browser-bound scraping and I/O-bound evaluation run on separate queues so each scales on its own
+    task_routes={
+        'app.logic.run_single_job': {'queue': 'scrape'},
+        'app.logic.run_job_group': {'queue': 'scrape'},
+        'app.logic.evaluate_listings': {'queue': 'evaluate'},
+    },
 )
 
 # This is still useful for other tasks, but we explicitly import logic
@@ -21,4 +32,39 @@ celery.autodiscover_tasks(['app'])
 
 @task_failure.connect
 def handle_task_failure(task_id=None, exception=None, **kwargs):
-    print(f"Task {task_id} failed: {exception}")
\ No newline at end of file
+    print(f"Task {task_id} failed: {exception}")
+
+# The exporter runs in the main process; prefork children report through PROMETHEUS_MULTIPROC_DIR.
+# Connected first so the directory is wiped before anything in this run records a sample.
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    reset_multiproc_dir()
+    start_worker_exporter()
+
+# The runtime is created inside the process that runs tasks: the main process for the solo pool,
+# each forked child otherwise, so pooled connections are never shared across a fork.
+@worker_init.connect
+def start_solo_worker_runtime(sender=None, **kwargs):
+    # The worker's pool class reflects --pool on the command line, which celery.conf.worker_pool doesn't
+    pool_cls = getattr(sender, 'pool_cls', None) or celery.conf.worker_pool
+    if issubclass(get_implementation(pool_cls), SoloPool):
+        configure_tracing('worker')
+        runtime.start()
+
+@worker_process_init.connect
+def start_child_worker_runtime(**kwargs):
+    runtime.reset_after_fork()
+    # The span exporter thread doesn't survive a fork, so each child sets up its own
+    configure_tracing('worker')
+    runtime.start()
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def stop_worker_runtime(**kwargs):
+    runtime.stop()
+    shutdown_tracing()
+
+@worker_process_shutdown.connect
+def drop_child_metrics(pid=None, **kwargs):
+    if pid:
+        mark_process_dead(pid)
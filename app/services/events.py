@@ -0,0 +1,48 @@
+import asyncio
+import json
+from typing import AsyncGenerator
+from uuid import UUID
+
+import redis
+import redis.asyncio as aioredis
+
+from app.config import REDIS_URL
+
+KEEPALIVE_SECONDS = 15
+
+# Workers publish synchronously so no client is tied to a task's event loop
+_publisher = redis.Redis.from_url(REDIS_URL)
+
+def _job_channel(job_id: UUID) -> str:
+    return f"job:{job_id}:events"
+
+def publish_job_event(job_id: UUID, event: str, data: dict) -> None:
+    """Publish a job progress event; failures are logged and never interrupt the job."""
+    try:
+        _publisher.publish(_job_channel(job_id), json.dumps({"event": event, "data": data}, default=str))
+    except redis.RedisError as e:
+        print(f"Failed to publish {event} event for job {job_id}: {str(e)}")
+
+def _format_sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+async def stream_job_events(job_id: UUID, is_disconnected) -> AsyncGenerator[str, None]:
+    """Relay a job's pub/sub events as Server-Sent Events until the client goes away."""
+    client = aioredis.Redis.from_url(REDIS_URL)
+    pubsub = client.pubsub()
+    await pubsub.subscribe(_job_channel(job_id))
+    try:
+        yield ": connected\n\n"
+        while not await is_disconnected():
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=KEEPALIVE_SECONDS)
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            payload = json.loads(message["data"])
+            yield _format_sse(payload["event"], json.dumps(payload["data"]))
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await pubsub.unsubscribe(_job_channel(job_id))
+        await pubsub.aclose()
+        await client.aclose()
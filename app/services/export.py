@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+from typing import AsyncGenerator, AsyncIterator, Dict, List
+from uuid import UUID
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.config import EXPORT_BATCH_SIZE
+from app.db.database import SCORE_COMPONENT_COLUMNS
+
+EXPORT_SCHEMA = pa.schema([
+    ('id', pa.string()),
+    ('title', pa.string()),
+    ('cover_image_url', pa.string()),
+    ('location', pa.string()),
+    ('cost', pa.int64()),
+    ('bedrooms', pa.int64()),
+    ('bathrooms', pa.float64()),
+    ('square_footage', pa.int64()),
+    ('score', pa.float64()),
+    ('link', pa.string()),
+    *[(column, pa.float64()) for column in SCORE_COMPONENT_COLUMNS]
+])
+EXPORT_COLUMNS = EXPORT_SCHEMA.names
+
+
+async def _batches(rows: AsyncIterator[Dict], size: int = EXPORT_BATCH_SIZE) -> AsyncGenerator[List[Dict], None]:
+    batch = []
+    async for row in rows:
+        batch.append({column: str(value) if isinstance(value, UUID) else value for column, value in row.items()})
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def csv_chunks(rows: AsyncIterator[Dict]) -> AsyncGenerator[bytes, None]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+    async for batch in _batches(rows):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def ndjson_chunks(rows: AsyncIterator[Dict]) -> AsyncGenerator[bytes, None]:
+    async for batch in _batches(rows):
+        yield "".join(json.dumps(row) + "\n" for row in batch).encode()
+
+
+class _DrainableSink:
+    """Write-only file whose contents are handed out and dropped as they are written.
+
+    It keeps counting positions across drains, because the Parquet footer records absolute offsets.
+    """
+    mode = 'wb'
+    closed = False
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def parquet_chunks(rows: AsyncIterator[Dict]) -> AsyncGenerator[bytes, None]:
+    """Each batch becomes one row group, written out as soon as it's full."""
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), EXPORT_SCHEMA)
+    try:
+        async for batch in _batches(rows):
+            writer.write_table(pa.Table.from_pylist(batch, schema=EXPORT_SCHEMA))
+            if data := sink.drain():
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+# Format name -> (media type, file extension, chunk generator)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv', csv_chunks),
+    'ndjson': ('application/x-ndjson', 'ndjson', ndjson_chunks),
+    'parquet': ('application/vnd.apache.parquet', 'parquet', parquet_chunks),
+}
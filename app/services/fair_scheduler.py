@@ -0,0 +1,175 @@
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+import redis
+
+from app.services.celery_app import celery
+from app.config import (
+    REDIS_URL, USER_MAX_CONCURRENT_EVALUATIONS, USER_MAX_CONCURRENT_SCRAPES, EVALUATION_MAX_IN_FLIGHT,
+    DAILY_TOKEN_BUDGET, DAILY_PAGE_BUDGET
+)
+
+# Slots expire on their own so a crashed task can't hold a user's capacity forever
+EVALUATION_SLOT_TTL_SECONDS = 15 * 60
+SCRAPE_SLOT_TTL_SECONDS = 45 * 60
+BUDGET_KEY_TTL_SECONDS = 2 * 24 * 60 * 60
+
+_ACTIVE_USERS_KEY = "fair:eval:users"
+_ROUND_ROBIN_KEY = "fair:eval:rr"
+_WEIGHTS_KEY = "fair:eval:weights"
+_GLOBAL_SLOTS_KEY = "fair:slots:evaluate"
+_DISPATCH_LOCK_KEY = "fair:eval:dispatch-lock"
+
+_redis = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+
+# Drops expired slots, checks the cap and takes a slot in one step, so workers racing for a user's
+# last slot can't both pass the check
+_acquire_slot_script = _redis.register_script("""
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[4])
+return 1
+""")
+
+
+def _backlog_key(user_id) -> str:
+    return f"fair:eval:backlog:{user_id}"
+
+
+def _slots_key(kind: str, user_id) -> str:
+    return f"fair:slots:{kind}:{user_id}"
+
+
+def _budget_key(kind: str, user_id) -> str:
+    return f"fair:budget:{kind}:{user_id}:{datetime.utcnow():%Y%m%d}"
+
+
+def _active_slots(key: str) -> int:
+    _redis.zremrangebyscore(key, "-inf", time.time())
+    return _redis.zcard(key)
+
+
+# Concurrency slots
+
+def acquire_scrape_slot(user_id: UUID) -> Optional[str]:
+    """Take one of the user's scrape slots. Returns the slot ID, or None if the user is at their cap."""
+    slot_id = str(uuid.uuid4())
+    now = time.time()
+    acquired = _acquire_slot_script(
+        keys=[_slots_key("scrape", user_id)],
+        args=[now, USER_MAX_CONCURRENT_SCRAPES, now + SCRAPE_SLOT_TTL_SECONDS, slot_id]
+    )
+    return slot_id if acquired else None
+
+
+def release_scrape_slot(user_id: UUID, slot_id: str) -> None:
+    _redis.zrem(_slots_key("scrape", user_id), slot_id)
+
+
+def release_evaluation_slot(user_id: UUID, slot_id: str) -> None:
+    _redis.zrem(_slots_key("evaluate", user_id), slot_id)
+    _redis.zrem(_GLOBAL_SLOTS_KEY, slot_id)
+
+
+# Daily budgets
+
+def record_usage(kind: str, user_id: UUID, amount: int) -> None:
+    """Charge `amount` tokens or pages against the user's daily budget."""
+    if not amount:
+        return
+    key = _budget_key(kind, user_id)
+    pipeline = _redis.pipeline()
+    pipeline.incrby(key, amount)
+    pipeline.expire(key, BUDGET_KEY_TTL_SECONDS)
+    pipeline.execute()
+
+
+def within_budget(kind: str, user_id: UUID) -> bool:
+    limit = DAILY_TOKEN_BUDGET if kind == "tokens" else DAILY_PAGE_BUDGET
+    return int(_redis.get(_budget_key(kind, user_id)) or 0) < limit
+
+
+# Evaluation backlog
+
+def submit_evaluations(
+    user_id: UUID, job_id: UUID, listing_batches: List[List[UUID]], weight: float = 1.0, run_id: Optional[UUID] = None
+) -> None:
+    """Queue a job's listing batches behind the user's other work and dispatch what capacity allows."""
+    if not listing_batches:
+        return
+    pipeline = _redis.pipeline()
+    pipeline.rpush(_backlog_key(user_id), *[
+        json.dumps({
+            "job_id": str(job_id),
+            "listing_ids": [str(listing_id) for listing_id in batch],
+            "run_id": str(run_id) if run_id else None
+        })
+        for batch in listing_batches
+    ])
+    pipeline.hset(_WEIGHTS_KEY, str(user_id), weight)
+    pipeline.sadd(_ACTIVE_USERS_KEY, str(user_id))
+    pipeline.execute()
+    dispatch_evaluations()
+
+
+def dispatch_evaluations() -> int:
+    """Move backlog batches onto the evaluate queue by weighted round robin across users.
+
+    Each pass gives every user up to `weight` batches, skipping users at their concurrency cap, until
+    the global in-flight limit is reached or backlogs run dry. Only dispatched work reaches Celery, so
+    one user's large backlog can't queue ahead of everyone else. Returns the number of batches sent.
+    """
+    lock = _redis.lock(_DISPATCH_LOCK_KEY, timeout=30, blocking=False)
+    if not lock.acquire():
+        return 0
+    try:
+        users = sorted(_redis.smembers(_ACTIVE_USERS_KEY))
+        if not users:
+            return 0
+        start = int(_redis.incr(_ROUND_ROBIN_KEY)) % len(users)
+        users = users[start:] + users[:start]
+        weights = _redis.hgetall(_WEIGHTS_KEY)
+
+        dispatched = 0
+        progressed = True
+        while progressed and _active_slots(_GLOBAL_SLOTS_KEY) < EVALUATION_MAX_IN_FLIGHT:
+            progressed = False
+            for user_id in users:
+                for _ in range(max(int(float(weights.get(user_id, 1))), 1)):
+                    if _active_slots(_GLOBAL_SLOTS_KEY) >= EVALUATION_MAX_IN_FLIGHT:
+                        break
+                    user_slots_key = _slots_key("evaluate", user_id)
+                    if _active_slots(user_slots_key) >= USER_MAX_CONCURRENT_EVALUATIONS:
+                        break
+                    entry = _redis.lpop(_backlog_key(user_id))
+                    if entry is None:
+                        _redis.srem(_ACTIVE_USERS_KEY, user_id)
+                        # A submit may have landed between the pop and the removal
+                        if _redis.llen(_backlog_key(user_id)):
+                            _redis.sadd(_ACTIVE_USERS_KEY, user_id)
+                        break
+
+                    batch = json.loads(entry)
+                    slot_id = str(uuid.uuid4())
+                    expires_at = time.time() + EVALUATION_SLOT_TTL_SECONDS
+                    _redis.zadd(user_slots_key, {slot_id: expires_at})
+                    _redis.zadd(_GLOBAL_SLOTS_KEY, {slot_id: expires_at})
+                    celery.send_task(
+                        'app.logic.evaluate_listings',
+                        args=[batch["job_id"], batch["listing_ids"]],
+                        kwargs={"user_id": user_id, "slot_id": slot_id, "run_id": batch.get("run_id")}
+                    )
+                    dispatched += 1
+                    progressed = True
+        return dispatched
+    finally:
+        try:
+            lock.release()
+        except redis.exceptions.LockError:
+            pass
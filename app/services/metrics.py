@@ -0,0 +1,144 @@
+import glob
+import os
+import time
+from typing import Iterable, Optional
+
+import redis
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, start_http_server
+from prometheus_client import multiprocess
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import REDIS_URL, WORKER_METRICS_PORT
+
+# Prefork workers each write their samples to files in this directory and the exporter aggregates them
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if MULTIPROC_DIR:
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+CELERY_QUEUES = ('scrape', 'evaluate', 'celery')
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Time to produce a response, per route template',
+    ['method', 'route', 'status']
+)
+DB_QUERY_SECONDS = Histogram(
+    'db_query_duration_seconds', 'Database statement latency',
+    ['engine', 'operation'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+PAGE_LOAD_SECONDS = Histogram(
+    'selenium_page_load_duration_seconds', 'Time for the browser to load a page',
+    ['outcome'],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+)
+LLM_REQUEST_SECONDS = Histogram(
+    'llm_request_duration_seconds', 'Latency of listing evaluation calls to the model',
+    ['model'],
+    buckets=(0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+)
+LLM_TOKENS = Counter('llm_tokens', 'Tokens used by listing evaluation calls', ['model'])
+LLM_ERRORS = Counter('llm_errors', 'Failed listing evaluation calls', ['model'])
+JOB_STAGE_SECONDS = Histogram(
+    'job_stage_duration_seconds', 'Time spent per job run stage',
+    ['stage'],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 2400)
+)
+JOB_RUNS = Counter('job_runs', 'Finished job runs', ['status'])
+EVALUATIONS = Counter('listing_evaluations', 'Listing evaluations by outcome', ['outcome'])
+# Each process sets its own pool's gauges; in multiprocess mode the exporter sums those of live processes
+DB_POOL_CHECKED_OUT = Gauge('db_pool_checked_out', 'Connections in use', ['engine'], multiprocess_mode='livesum')
+DB_POOL_IDLE = Gauge('db_pool_idle', 'Idle connections held by the pool', ['engine'], multiprocess_mode='livesum')
+DB_POOL_OVERFLOW = Gauge('db_pool_overflow', 'Connections open beyond the pool size', ['engine'], multiprocess_mode='livesum')
+DB_POOL_SIZE = Gauge('db_pool_size', 'Configured pool size', ['engine'], multiprocess_mode='livesum')
+
+
+def _record_pool(name: str, pool) -> None:
+    if not hasattr(pool, 'checkedout'):
+        return
+    DB_POOL_CHECKED_OUT.labels(name).set(pool.checkedout())
+    DB_POOL_IDLE.labels(name).set(pool.checkedin())
+    DB_POOL_OVERFLOW.labels(name).set(max(pool.overflow(), 0))
+    DB_POOL_SIZE.labels(name).set(pool.size())
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Time every statement on an engine and expose its connection pool. Async engines pass their sync_engine."""
+    # Pool gauges are refreshed as connections move, in whichever process owns the pool
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        _record_pool(name, engine.pool)
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        _record_pool(name, engine.pool)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _observe(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['query_started_at'].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement else 'UNKNOWN'
+        DB_QUERY_SECONDS.labels(name, operation).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _discard_timer(exception_context):
+        if exception_context.connection is not None and exception_context.connection.info.get('query_started_at'):
+            exception_context.connection.info['query_started_at'].pop()
+
+
+class QueueDepthCollector:
+    """Messages waiting in each Celery queue, read from the Redis broker at scrape time."""
+    def __init__(self):
+        self._redis = redis.Redis.from_url(REDIS_URL)
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        depth = GaugeMetricFamily('celery_queue_depth', 'Tasks waiting in the queue', labels=['queue'])
+        try:
+            pipeline = self._redis.pipeline()
+            for queue in CELERY_QUEUES:
+                pipeline.llen(queue)
+            for queue, length in zip(CELERY_QUEUES, pipeline.execute()):
+                depth.add_metric([queue], length)
+        except redis.RedisError as e:
+            print(f"Failed to read Celery queue depth: {str(e)}")
+        yield depth
+
+
+def _registry(include_queue_depth: bool = False) -> CollectorRegistry:
+    if not MULTIPROC_DIR:
+        if include_queue_depth:
+            REGISTRY.register(QueueDepthCollector())
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    if include_queue_depth:
+        registry.register(QueueDepthCollector())
+    return registry
+
+
+def render_metrics() -> bytes:
+    """Exposition text for the web app's /metrics endpoint."""
+    return generate_latest(_registry())
+
+
+def start_worker_exporter(port: Optional[int] = None) -> None:
+    """Serve the worker's metrics, plus Celery queue depth, over HTTP from the worker's main process."""
+    start_http_server(port or WORKER_METRICS_PORT, registry=_registry(include_queue_depth=True))
+    print(f"Worker metrics exporter listening on port {port or WORKER_METRICS_PORT}")
+
+
+def reset_multiproc_dir() -> None:
+    """Delete samples left by processes of earlier worker runs. Call in the main process before any child forks."""
+    if MULTIPROC_DIR:
+        for path in glob.glob(os.path.join(MULTIPROC_DIR, "*.db")):
+            os.remove(path)
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop a finished prefork child's live samples from the shared directory."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
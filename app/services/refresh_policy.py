@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.config import JOB_REFRESH_INTERVAL_HOURS
+
+MIN_REFRESH_INTERVAL_HOURS = 2
+MAX_REFRESH_INTERVAL_HOURS = 7 * 24
+
+# Weight of the latest run in the new-listing rate moving average
+RATE_SMOOTHING = 0.3
+# New listings per day at which a search refreshes twice as often as the base interval
+RATE_SCALE = 10.0
+# Weight of the fraction of a job's listings that were new or edited in the last run
+CHURN_WEIGHT = 2.0
+
+# Searches viewed within this window are considered hot and refresh twice as often
+ACTIVE_VIEW_HOURS = 24
+# Unviewed searches back off by doubling their interval every this many idle days, up to a cap
+IDLE_DOUBLING_DAYS = 7
+MAX_IDLE_BACKOFF = 8.0
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    return value.replace(tzinfo=None) if value else None
+
+
+def smoothed_new_listing_rate(new_listings: int, last_run_at: Optional[datetime], previous_rate: Optional[float], now: datetime) -> float:
+    """Exponential moving average of new listings per day across runs."""
+    elapsed_days = ((now - _naive(last_run_at)).total_seconds() / 86400) if last_run_at else JOB_REFRESH_INTERVAL_HOURS / 24
+    observed_rate = new_listings / max(elapsed_days, MIN_REFRESH_INTERVAL_HOURS / 24)
+    if previous_rate is None:
+        return observed_rate
+    return RATE_SMOOTHING * observed_rate + (1 - RATE_SMOOTHING) * previous_rate
+
+
+def activity_factor(last_viewed_at: Optional[datetime], created_at: Optional[datetime], now: datetime) -> float:
+    """Interval multiplier from how recently anyone looked at the job's results."""
+    last_active = _naive(last_viewed_at) or _naive(created_at) or now
+    idle_hours = (now - last_active).total_seconds() / 3600
+    if idle_hours <= ACTIVE_VIEW_HOURS:
+        return 0.5
+    return min(2 ** ((idle_hours / 24) / IDLE_DOUBLING_DAYS), MAX_IDLE_BACKOFF)
+
+
+def compute_next_run_at(
+    now: datetime,
+    new_listing_rate: float,
+    churn: float,
+    last_viewed_at: Optional[datetime],
+    created_at: Optional[datetime]
+) -> datetime:
+    """Next refresh time: sooner for searches with many new listings, churning results or active viewers."""
+    interval_hours = JOB_REFRESH_INTERVAL_HOURS / (1 + new_listing_rate / RATE_SCALE + churn * CHURN_WEIGHT)
+    interval_hours *= activity_factor(last_viewed_at, created_at, now)
+    interval_hours = min(max(interval_hours, MIN_REFRESH_INTERVAL_HOURS), MAX_REFRESH_INTERVAL_HOURS)
+    return now + timedelta(hours=interval_hours)
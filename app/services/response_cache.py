@@ -0,0 +1,148 @@
+import hashlib
+import json
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
+
+import redis
+import redis.asyncio as aioredis
+
+from app.config import REDIS_URL, RESPONSE_CACHE_TTL_SECONDS
+
+# Writers bump versions synchronously, like job events, so no client is tied to a task's event loop
+_writer = redis.Redis.from_url(REDIS_URL)
+_reader: Optional[aioredis.Redis] = None
+
+
+def _client() -> aioredis.Redis:
+    global _reader
+    if _reader is None:
+        _reader = aioredis.Redis.from_url(REDIS_URL)
+    return _reader
+
+
+def _job_version_key(job_id) -> str:
+    return f"cache:version:job:{job_id}"
+
+
+def _user_version_key(user_id) -> str:
+    return f"cache:version:user:{user_id}"
+
+
+def make_etag(*parts) -> str:
+    return '"' + hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest() + '"'
+
+
+# Invalidation: every write that changes what a job endpoint returns bumps a version, which changes the ETag
+
+def bump_job_versions(job_ids: Iterable[UUID]) -> None:
+    """Invalidate cached responses of these jobs; failures are logged and never interrupt the write."""
+    job_ids = set(job_ids)
+    if not job_ids:
+        return
+    try:
+        pipeline = _writer.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipeline.incr(_job_version_key(job_id))
+        pipeline.execute()
+    except redis.RedisError as e:
+        print(f"Failed to bump cache versions for jobs {job_ids}: {str(e)}")
+
+
+def bump_user_version(user_id: UUID) -> None:
+    """Invalidate a user's cached job list after the set of jobs they can see changes."""
+    try:
+        _writer.incr(_user_version_key(user_id))
+    except redis.RedisError as e:
+        print(f"Failed to bump cache version for user {user_id}: {str(e)}")
+
+
+async def claim_job_view(job_id: UUID, interval_seconds: int) -> bool:
+    """Whether this request should record a view of the job; at most one per interval gets through to Postgres.
+
+    Falls back to True when Redis is unavailable, since the database write is throttled on its own.
+    """
+    try:
+        return bool(await _client().set(f"job-view:{job_id}", 1, nx=True, ex=interval_seconds))
+    except redis.RedisError:
+        return True
+
+
+# Lookups return None on a miss or when Redis is unavailable, so callers fall back to the database
+
+async def job_listings_etag(user_id: UUID, job_id: UUID, query: str) -> Optional[str]:
+    try:
+        version = await _client().get(_job_version_key(job_id))
+    except redis.RedisError:
+        return None
+    return make_etag(user_id, job_id, int(version or 0), query)
+
+
+async def get_job_listings_response(etag: str) -> Optional[Tuple[bytes, Optional[str]]]:
+    """Cached body and next-page cursor of a job listings page."""
+    try:
+        entry = await _client().hmget(f"cache:job-listings:{etag}", "body", "next_cursor")
+    except redis.RedisError:
+        return None
+    body, next_cursor = entry
+    if body is None:
+        return None
+    return body, next_cursor.decode() if next_cursor else None
+
+
+async def set_job_listings_response(etag: str, body: bytes, next_cursor: Optional[str]) -> None:
+    key = f"cache:job-listings:{etag}"
+    try:
+        pipeline = _client().pipeline(transaction=False)
+        pipeline.hset(key, mapping={"body": body, "next_cursor": next_cursor or ""})
+        pipeline.expire(key, RESPONSE_CACHE_TTL_SECONDS)
+        await pipeline.execute()
+    except redis.RedisError as e:
+        print(f"Failed to cache job listings response: {str(e)}")
+
+
+async def user_jobs_etag(user_id: UUID, job_ids: List[str]) -> Optional[str]:
+    """ETag of a user's job list as of now, assuming it covers `job_ids`. None if Redis is unavailable."""
+    try:
+        versions = await _client().mget([_user_version_key(user_id)] + [_job_version_key(job_id) for job_id in job_ids])
+    except redis.RedisError:
+        return None
+    return make_etag(user_id, *[int(version or 0) for version in versions], *job_ids)
+
+
+async def get_user_jobs_response(user_id: UUID) -> Tuple[Optional[str], Optional[bytes], List[str]]:
+    """The current ETag of a user's cached job list and its body, or None for both if it's stale or missing.
+
+    The entry remembers which jobs it covers, so it stays valid until the user's version or one of
+    those jobs' versions moves. Those job IDs are returned even when the entry is stale, so the caller
+    can read their versions before querying again.
+    """
+    try:
+        raw = await _client().get(f"cache:user-jobs:{user_id}")
+    except redis.RedisError:
+        return None, None, []
+    if raw is None:
+        return None, None, []
+    entry = json.loads(raw)
+    etag = await user_jobs_etag(user_id, entry["job_ids"])
+    if etag != entry["etag"]:
+        return None, None, entry["job_ids"]
+    return etag, entry["body"].encode(), entry["job_ids"]
+
+
+async def set_user_jobs_response(user_id: UUID, etag: Optional[str], job_ids: List[str], body: bytes) -> None:
+    """Cache a user's job list under an ETag read with user_jobs_etag before the list was queried.
+
+    A version bumped during the query then no longer matches, so a stale body can't be served under it.
+    If the list turned out to cover other jobs than the ETag assumed, the entry is stale from the start
+    and only remembers the job IDs for the next request.
+    """
+    if etag is None:
+        return
+    try:
+        await _client().set(
+            f"cache:user-jobs:{user_id}",
+            json.dumps({"etag": etag, "job_ids": job_ids, "body": body.decode()}),
+            ex=RESPONSE_CACHE_TTL_SECONDS
+        )
+    except redis.RedisError as e:
+        print(f"Failed to cache job list for user {user_id}: {str(e)}")
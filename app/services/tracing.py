@@ -0,0 +1,98 @@
+import asyncio
+from functools import wraps
+from typing import Dict, Optional
+
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from opentelemetry import context, propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+from app.config import TRACE_EXPORTER, TRACE_FILE_PATH, TRACE_SAMPLE_RATE
+
+# Resolves to a no-op tracer until configure_tracing installs a provider, so untraced processes pay almost nothing
+tracer = trace.get_tracer("realestagent")
+
+_TRACE_HEADERS = ('traceparent', 'tracestate')
+_task_spans: Dict[str, tuple] = {}
+_configured = False
+
+
+def configure_tracing(service_name: str) -> None:
+    """Install the tracer provider for this process. Call once per process, after any fork."""
+    global _configured
+    if _configured or TRACE_EXPORTER == "none":
+        return
+    if TRACE_EXPORTER == "otlp":
+        # Endpoint and headers come from the standard OTEL_EXPORTER_OTLP_* environment variables
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter()
+    else:
+        exporter = ConsoleSpanExporter(
+            out=open(TRACE_FILE_PATH, "a", buffering=1),
+            formatter=lambda span: span.to_json(indent=None) + "\n"
+        )
+    # Root spans are sampled at TRACE_SAMPLE_RATE; children follow their parent so traces stay whole
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(TRACE_SAMPLE_RATE))
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _configured = True
+    print(f"Tracing {service_name} to {TRACE_EXPORTER} at sample rate {TRACE_SAMPLE_RATE}")
+
+
+def shutdown_tracing() -> None:
+    """Flush spans still buffered in the batch processor."""
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "shutdown"):
+        provider.shutdown()
+
+
+def traced(name: Optional[str] = None):
+    """Run a sync or async function inside a span named after it."""
+    def decorator(func):
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.start_as_current_span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Celery propagation: the publisher's context rides in the message headers and becomes the task span's parent
+
+@before_task_publish.connect
+def _inject_trace_context(headers=None, **kwargs):
+    if headers is not None:
+        propagate.inject(headers)
+
+
+@task_prerun.connect
+def _start_task_span(task_id=None, task=None, **kwargs):
+    carrier = {key: value for key in _TRACE_HEADERS if (value := getattr(task.request, key, None))}
+    span = tracer.start_span(f"celery.{task.name}", context=propagate.extract(carrier), kind=trace.SpanKind.CONSUMER)
+    span.set_attribute("celery.task_id", task_id)
+    token = context.attach(trace.set_span_in_context(span))
+    _task_spans[task_id] = (span, token)
+
+
+@task_postrun.connect
+def _end_task_span(task_id=None, state=None, **kwargs):
+    if not (entry := _task_spans.pop(task_id, None)):
+        return
+    span, token = entry
+    if state:
+        span.set_attribute("celery.state", state)
+    span.end()
+    context.detach(token)
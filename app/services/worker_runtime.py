@@ -0,0 +1,68 @@
+import asyncio
+from typing import Coroutine, Optional
+
+import httpx
+from sqlalchemy import text
+
+from app.db.database import async_engine
+from app.core.base_scraper import DriverManager
+from app.core.evaluator import ANTHROPIC_CLIENT, OPENAI_CLIENT
+
+class WorkerRuntime:
+    """Long-lived event loop and clients shared by every task a worker process runs.
+
+    Running each task with asyncio.run would create a new loop per task, leaving the async engine's
+    pooled connections bound to a dead loop. Here one loop lives for the whole process, so the
+    engine pool, HTTP client and LLM clients stay warm between tasks.
+    """
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.http_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def started(self) -> bool:
+        return self.loop is not None
+
+    def start(self):
+        if self.started:
+            return
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.http_client = httpx.AsyncClient(timeout=10, follow_redirects=True)
+        try:
+            self.loop.run_until_complete(self._warm_db_pool())
+        except Exception as e:
+            print(f"Failed to warm database pool: {str(e)}")
+        print("Worker runtime started")
+
+    async def _warm_db_pool(self):
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    def reset_after_fork(self):
+        """Drop state inherited from a parent process without closing the parent's connections."""
+        self.loop = None
+        self.http_client = None
+        async_engine.sync_engine.dispose(close=False)
+
+    def run(self, coro: Coroutine):
+        """Run a coroutine to completion on the worker's loop, starting the runtime if needed."""
+        self.start()
+        return self.loop.run_until_complete(coro)
+
+    def stop(self):
+        if not self.started:
+            return
+        try:
+            self.loop.run_until_complete(self.http_client.aclose())
+            self.loop.run_until_complete(async_engine.dispose())
+        finally:
+            OPENAI_CLIENT.close()
+            ANTHROPIC_CLIENT.close()
+            DriverManager.get_instance().quit_driver()
+            self.loop.close()
+            self.loop = None
+            self.http_client = None
+            print("Worker runtime stopped")
+
+runtime = WorkerRuntime()
@@ -1,4 +1,4 @@
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { useParams } from 'react-router-dom';
 import { Cloud } from '@carbon/icons-react';
 import { toast } from 'react-hot-toast';
@@ -15,70 +15,109 @@ interface Post {
   bathrooms: number;
   square_footage: number;
   score: number;
-  trace: string;
   link: string;
 }
 
-type SortField = keyof Omit<Post, 'cover_image_url' | 'id'>;
-type SortDirection = 'asc' | 'desc';
+// Sorting happens on the server so every page continues the same order across the whole job
+type SortOption = 'score' | 'price' | 'price_desc' | 'square_footage' | 'newest';
+
+const SORT_LABELS: Record<SortOption, string> = {
+  score: 'Score',
+  price: 'Price ↑',
+  price_desc: 'Price ↓',
+  square_footage: 'Size',
+  newest: 'Newest',
+};
 
 function Feed() {
   const { jobId } = useParams<{ jobId: string }>();
   const [listings, setListings] = useState<Post[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
-  const [sortField, setSortField] = useState<SortField>('cost');
-  const [sortDirection, setSortDirection] = useState<SortDirection>('asc');
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [traces, setTraces] = useState<Record<string, string>>({});
+  const [sort, setSort] = useState<SortOption>('score');
+  const sortRef = useRef(sort);
+  sortRef.current = sort;
 
   const job = jobId ? getJob(jobId) : null;
 
+  // Listings come in pages; the API returns the next page's cursor in the X-Next-Cursor header
+  const fetchListingsPage = async (cursor: string | null): Promise<{ data: Post[]; next: string | null }> => {
+    const params = new URLSearchParams({ sort });
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetch(`${API_BASE_URL}/jobs/${jobId}?${params}`, {
+      credentials: 'include',
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to fetch listings');
+    }
+
+    return { data: await response.json(), next: response.headers.get('X-Next-Cursor') };
+  };
+
+  // A new sort starts over from the first page; responses for a sort that was since replaced are dropped
   useEffect(() => {
+    let cancelled = false;
+    setListings([]);
+    setNextCursor(null);
+    setLoading(true);
+
     const fetchListings = async () => {
       try {
-        const response = await fetch(`${API_BASE_URL}/jobs/${jobId}`, {
-          credentials: 'include',
-        });
-
-        if (!response.ok) {
-          throw new Error('Failed to fetch listings');
-        }
-
-        const data = await response.json();
+        const { data, next } = await fetchListingsPage(null);
+        if (cancelled) return;
         console.log('Fetched listings:', data);
         setListings(data);
+        setNextCursor(next);
       } catch (err) {
-        setError(err instanceof Error ? err.message : 'An error occurred');
+        if (!cancelled) setError(err instanceof Error ? err.message : 'An error occurred');
       } finally {
-        setLoading(false);
+        if (!cancelled) setLoading(false);
       }
     };
 
     fetchListings();
-  }, [jobId]);
-
-  const handleSort = (field: SortField) => {
-    if (field === sortField) {
-      setSortDirection(prev => prev === 'asc' ? 'desc' : 'asc');
-    } else {
-      setSortField(field);
-      setSortDirection('asc');
+    return () => {
+      cancelled = true;
+    };
+  }, [jobId, sort]);
+
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    const requestedSort = sort;
+    try {
+      const { data, next } = await fetchListingsPage(nextCursor);
+      if (requestedSort !== sortRef.current) return;
+      setListings(prev => [...prev, ...data]);
+      setNextCursor(next);
+    } catch (err) {
+      toast.error(err instanceof Error ? err.message : 'Failed to load more listings');
+    } finally {
+      setLoadingMore(false);
     }
   };
 
-  const sortedListings = [...listings].sort((a, b) => {
-    const aValue = a[sortField];
-    const bValue = b[sortField];
-    
-    if (typeof aValue === 'string' && typeof bValue === 'string') {
-      return sortDirection === 'asc' 
-        ? aValue.localeCompare(bValue)
-        : bValue.localeCompare(aValue);
+  // The list leaves out score reasoning; it is fetched from the listing detail endpoint on request
+  const handleShowTrace = async (e: React.MouseEvent, listingId: string) => {
+    e.preventDefault();
+    e.stopPropagation();
+    try {
+      const response = await fetch(`${API_BASE_URL}/jobs/${jobId}/listings/${listingId}`, {
+        credentials: 'include',
+      });
+      if (!response.ok) {
+        throw new Error('Failed to fetch listing details');
+      }
+      const detail = await response.json();
+      setTraces(prev => ({ ...prev, [listingId]: detail.trace || 'No reasoning available' }));
+    } catch (err) {
+      toast.error(err instanceof Error ? err.message : 'Failed to fetch listing details');
     }
-    
-    return sortDirection === 'asc'
-      ? (aValue as number) - (bValue as number)
-      : (bValue as number) - (aValue as number);
-  });
+  };
 
   const handleListingClick = (e: React.MouseEvent, link: string) => {
     e.preventDefault();
@@ -109,17 +148,12 @@ function Feed() {
     return <div className="text-red-500 text-center p-4">Error: {error}</div>;
   }
 
-  const SortButton = ({ field }: { field: SortField }) => (
+  const SortButton = ({ option }: { option: SortOption }) => (
     <button
-      onClick={() => handleSort(field)}
-      className="px-3 py-1 text-sm font-medium text-gray-700 hover:bg-gray-100 rounded"
+      onClick={() => setSort(option)}
+      className={`px-3 py-1 text-sm font-medium text-gray-700 hover:bg-gray-100 rounded ${sort === option ? 'bg-gray-100' : ''}`}
     >
-      {field.charAt(0).toUpperCase() + field.slice(1)}
-      {sortField === field && (
-        <span className="ml-1">
-          {sortDirection === 'asc' ? '↑' : '↓'}
-        </span>
-      )}
+      {SORT_LABELS[option]}
     </button>
   );
 
@@ -141,17 +175,13 @@ function Feed() {
       </div>
 
       <div className="mb-4 flex gap-4 border-b pb-4">
-        <SortButton field="title" />
-        <SortButton field="location" />
-        <SortButton field="cost" />
-        <SortButton field="bedrooms" />
-        <SortButton field="bathrooms" />
-        <SortButton field="square_footage" />
-        <SortButton field="score" />
+        {(Object.keys(SORT_LABELS) as SortOption[]).map(option => (
+          <SortButton key={option} option={option} />
+        ))}
       </div>
 
       <div className="flex flex-col gap-6 max-w-6xl mx-auto">
-        {sortedListings.map((listing) => (
+        {listings.map((listing) => (
           <div
             key={listing.id}
             className="flex bg-white rounded-lg shadow-md hover:shadow-lg transition-shadow cursor-pointer overflow-hidden h-64 animate-dropFadeIn"
@@ -194,9 +224,18 @@ function Feed() {
                 </div>
 
                 <div className="mt-auto">
-                  <div className="text-gray-500 text-sm line-clamp-2 mb-3">
-                    {listing.trace}
-                  </div>
+                  {traces[listing.id] ? (
+                    <div className="text-gray-500 text-sm line-clamp-2 mb-3">
+                      {traces[listing.id]}
+                    </div>
+                  ) : (
+                    <button
+                      onClick={(e) => handleShowTrace(e, listing.id)}
+                      className="text-gray-500 text-sm underline mb-3"
+                    >
+                      Why this score?
+                    </button>
+                  )}
                   <div className="pt-3 border-t">
                     <span className="text-blue-600 font-medium text-lg">
                       Score: {listing.score.toFixed(2)}
@@ -210,6 +249,15 @@ function Feed() {
         {listings.length === 0 && (
           <p className="text-center py-8 text-gray-500">No listings available.</p>
         )}
+        {nextCursor && (
+          <button
+            onClick={handleLoadMore}
+            disabled={loadingMore}
+            className="self-center px-4 py-2 text-sm font-medium text-gray-700 border rounded hover:bg-gray-100 disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        )}
       </div>
     </div>
   );
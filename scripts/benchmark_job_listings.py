@@ -0,0 +1,68 @@
+"""Measure GET /jobs/{job_id} throughput, latency and bytes on the wire against a running API.
+
+Usage:
+    python scripts/benchmark_job_listings.py --job-id <uuid> --token <session token> [--encoding br] [--uncached]
+
+Run it once per variant (before/after a change, per encoding) and compare the printed summaries.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+async def _worker(client: httpx.AsyncClient, url: str, params: dict, headers: dict, remaining: list, uncached: bool, samples: list):
+    while remaining:
+        remaining.pop()
+        # A throwaway query parameter changes the response cache key, so every request reaches the database
+        request_params = {**params, "bench": uuid.uuid4().hex} if uncached else params
+        started = time.perf_counter()
+        response = await client.get(url, params=request_params, headers=headers)
+        elapsed = time.perf_counter() - started
+        response.raise_for_status()
+        samples.append((elapsed, response.num_bytes_downloaded, len(response.content)))
+
+
+async def run(args) -> None:
+    url = f"{args.base_url.rstrip('/')}/jobs/{args.job_id}"
+    params = {"limit": args.limit}
+    headers = {"Accept-Encoding": args.encoding}
+    samples = []
+    async with httpx.AsyncClient(cookies={"session_token": args.token}, timeout=30) as client:
+        # Warm up connections and the response cache before timing
+        await client.get(url, params=params, headers=headers)
+        remaining = list(range(args.requests))
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            _worker(client, url, params, headers, remaining, args.uncached, samples)
+            for _ in range(args.concurrency)
+        ])
+        wall = time.perf_counter() - started
+
+    latencies = sorted(elapsed for elapsed, _, _ in samples)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{len(samples)} requests, concurrency {args.concurrency}, encoding {args.encoding}, {'uncached' if args.uncached else 'cached'}")
+    print(f"Throughput: {len(samples) / wall:.1f} req/s")
+    print(f"Latency ms: p50 {quantiles[49] * 1000:.1f}, p95 {quantiles[94] * 1000:.1f}, p99 {quantiles[98] * 1000:.1f}")
+    print(f"Bytes per response: {statistics.mean(wire for _, wire, _ in samples):.0f} on the wire, "
+          f"{statistics.mean(body for _, _, body in samples):.0f} decoded")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--job-id", required=True)
+    parser.add_argument("--token", required=True, help="Value of the session_token cookie")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=50, help="Listings per page")
+    parser.add_argument("--encoding", default="identity", choices=["identity", "gzip", "br"])
+    parser.add_argument("--uncached", action="store_true", help="Bypass the response cache on every request")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Measure the CPU time and size of encoding a job listings page, before and after orjson and brotli.
+
+Usage:
+    python scripts/benchmark_response_encoding.py [--listings 50] [--repeat 2000] [--quality 4]
+
+Runs offline on synthetic listings shaped like get_job_with_listings output, so it isolates serialization
+and compression from the database and network; benchmark_job_listings.py measures the whole request.
+"""
+import argparse
+import gzip
+import json
+import random
+import statistics
+import time
+import uuid
+
+import brotli
+import orjson
+
+
+def _listing(rng: random.Random) -> dict:
+    return {
+        "id": uuid.UUID(int=rng.getrandbits(128)),
+        "title": f"{rng.randint(1, 4)}BR apartment near {rng.choice(['Mission', 'SoMa', 'Sunset', 'Richmond'])} - {rng.choice(['sunny', 'renovated', 'quiet'])} unit with in-unit laundry",
+        "cover_image_url": f"https://images.craigslist.org/{uuid.UUID(int=rng.getrandbits(128)).hex[:17]}_600x450.jpg",
+        "location": "San Francisco",
+        "cost": rng.randint(1800, 6000),
+        "bedrooms": rng.randint(0, 4),
+        "bathrooms": rng.choice([1.0, 1.5, 2.0]),
+        "square_footage": rng.randint(350, 1800),
+        "score": round(rng.uniform(0, 100), 2),
+        "link": f"https://sfbay.craigslist.org/sfc/apa/d/{rng.getrandbits(40)}.html",
+        **{column: round(rng.uniform(0, 20), 3) for column in ['price_score', 'size_score', 'bedrooms_score', 'bathrooms_score', 'aesthetic_score']}
+    }
+
+
+def _time_ms(func, repeat: int) -> float:
+    """Median milliseconds per call."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run(args) -> None:
+    rng = random.Random(0)
+    page = [_listing(rng) for _ in range(args.listings)]
+    json_body = json.dumps(page, default=str).encode()
+    orjson_body = orjson.dumps(page)
+
+    # Serialization: stdlib json needs a fallback for UUIDs; orjson handles them natively
+    rows = [
+        ("json.dumps", _time_ms(lambda: json.dumps(page, default=str).encode(), args.repeat), len(json_body)),
+        ("orjson.dumps", _time_ms(lambda: orjson.dumps(page), args.repeat), len(orjson_body)),
+        ("gzip level 9", _time_ms(lambda: gzip.compress(orjson_body, 9), args.repeat), len(gzip.compress(orjson_body, 9))),
+        (f"brotli quality {args.quality}", _time_ms(lambda: brotli.compress(orjson_body, quality=args.quality), args.repeat),
+         len(brotli.compress(orjson_body, quality=args.quality))),
+    ]
+    print(f"{args.listings} listings, median of {args.repeat} runs")
+    for name, milliseconds, size in rows:
+        print(f"{name:<18} {milliseconds:8.3f} ms  {size:8d} bytes")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--listings", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--quality", type=int, default=4, help="Brotli quality; match BROTLI_QUALITY")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
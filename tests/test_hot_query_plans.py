@@ -0,0 +1,294 @@
+"""Query-plan and latency checks for the hot database queries.
+
+Seeds a large synthetic dataset into the Postgres database named by TEST_DATABASE_URL, then, for each hot
+helper, EXPLAINs the SQL it actually issues and asserts the planner uses the intended index (and doesn't
+seq-scan the big tables), and that the call stays within its latency budget.
+
+The database's tables are truncated, so point it at a throwaway database:
+
+    TEST_DATABASE_URL=postgresql://postgres:postgres@db:5432/hot_queries python -m pytest tests/test_hot_query_plans.py
+
+HOT_QUERY_SCALE multiplies the dataset size and HOT_QUERY_LATENCY_SCALE the latency budgets, for slow machines.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+if not TEST_DATABASE_URL:
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+# The engines are built at import, so point the app at the test database first
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+
+from fastapi import HTTPException
+from sqlalchemy import event, text
+
+from app.config import LIVENESS_BATCH_SIZE
+from app.db.database import (
+    async_engine, engine, get_user_jobs, get_job_with_listings, get_pending_evaluation_listing_ids,
+    get_listings_due_for_liveness_check, claim_due_jobs
+)
+from app.services.authentication import VerifyCode, verify_code
+
+SCALE = float(os.getenv("HOT_QUERY_SCALE", "1"))
+LATENCY_SCALE = float(os.getenv("HOT_QUERY_LATENCY_SCALE", "1"))
+
+USERS = int(2000 * SCALE)
+JOBS_PER_USER = 3
+LISTINGS = int(200_000 * SCALE)
+LISTINGS_PER_JOB = 50
+HOT_JOB_LISTINGS = int(20_000 * SCALE)  # The first job is much larger, like a long-running search
+VERIFICATION_CODES = int(200_000 * SCALE)
+EMAIL_DOMAIN = "hotquery.dev"
+
+LATENCY_RUNS = 5
+
+
+def _seed_id(kind: str, number: int) -> uuid.UUID:
+    """Matches md5(kind || number)::uuid in the seeding SQL."""
+    return uuid.UUID(hashlib.md5(f"{kind}{number}".encode()).hexdigest())
+
+
+SEED_STATEMENTS = [
+    "TRUNCATE users, listings, verification_codes CASCADE",
+    """
+    INSERT INTO users (id, email, is_active, account_status, scheduling_weight)
+    SELECT md5('user' || i)::uuid, 'user' || i || '@' || :domain, true, 'active', 1
+    FROM generate_series(0, :users - 1) i
+    """,
+    """
+    INSERT INTO jobs (id, user_id, name, created_at, updated_at, next_run_at)
+    SELECT md5('job' || j)::uuid, md5('user' || (j / :jobs_per_user))::uuid, 'Job ' || j,
+           now() - interval '30 days' * random(), now() - interval '30 days' * random(),
+           now() + interval '1 hour' * (random() * 73 - 1)
+    FROM generate_series(0, :users * :jobs_per_user - 1) j
+    """,
+    # Every user is invited to the first job of the next user
+    """
+    INSERT INTO job_access (user_id, job_id)
+    SELECT md5('user' || i)::uuid, md5('job' || (((i + 1) % :users) * :jobs_per_user))::uuid
+    FROM generate_series(0, :users - 1) i
+    """,
+    """
+    INSERT INTO listings (id, hash, post_id, title, price, bedrooms, bathrooms, square_footage, link,
+                          is_live, liveness_checked_at, last_scraped_at, created_at)
+    SELECT md5('listing' || l)::uuid, md5('hash' || l), 'post' || l, 'Listing ' || l,
+           1000 + (random() * 4000)::int, 1 + (random() * 3)::int, 1 + (random() * 2)::int, 400 + (random() * 1600)::int,
+           'https://example.org/listing/' || l, random() > 0.05,
+           CASE WHEN random() < 0.05 THEN NULL ELSE now() - interval '48 hours' * random() END,
+           now() - interval '30 days' * random(), now() - interval '30 days' * random()
+    FROM generate_series(0, :listings - 1) l
+    """,
+    """
+    INSERT INTO job_listing_scores (job_id, listing_id, score, needs_reevaluation, created_at)
+    SELECT md5('job' || j)::uuid, md5('listing' || ((j * :per_job + k) % :listings))::uuid,
+           CASE WHEN random() < 0.2 THEN 0 ELSE round((random() * 100)::numeric, 1) END, random() < 0.02,
+           now() - interval '30 days' * random()
+    FROM generate_series(0, :users * :jobs_per_user - 1) j, generate_series(0, :per_job - 1) k
+    """,
+    """
+    INSERT INTO job_listing_scores (job_id, listing_id, score, needs_reevaluation, created_at)
+    SELECT md5('job0')::uuid, md5('listing' || k)::uuid,
+           CASE WHEN random() < 0.2 THEN 0 ELSE round((random() * 100)::numeric, 1) END, random() < 0.02,
+           now() - interval '30 days' * random()
+    FROM generate_series(:per_job, :hot_job_listings - 1) k
+    """,
+    # Almost all codes are used or expired, as in production
+    """
+    INSERT INTO verification_codes (id, email, code, created_at, expires_at, used)
+    SELECT md5('code' || v)::uuid, 'user' || (v % :users) || '@' || :domain, lpad((random() * 999999)::int::text, 6, '0'),
+           (now() at time zone 'utc') - interval '30 days' * random(),
+           (now() at time zone 'utc') - interval '1 minute' * random(), random() < 0.95
+    FROM generate_series(0, :codes - 1) v
+    """,
+    "ANALYZE",
+]
+
+
+@pytest.fixture(scope="module")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.run_until_complete(async_engine.dispose())
+    loop.close()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def seeded_database():
+    params = {
+        "domain": EMAIL_DOMAIN,
+        "users": USERS,
+        "jobs_per_user": JOBS_PER_USER,
+        "listings": LISTINGS,
+        "per_job": LISTINGS_PER_JOB,
+        "hot_job_listings": HOT_JOB_LISTINGS,
+        "codes": VERIFICATION_CODES,
+    }
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")  # ANALYZE can't run in a transaction block
+        for statement in SEED_STATEMENTS:
+            connection.execute(text(statement), params)
+
+
+@contextmanager
+def captured_statements():
+    """Collect the (SQL, parameters) pairs sent to the database through the async engine."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+async def _explain(statement: str, parameters) -> dict:
+    async with async_engine.connect() as conn:
+        result = await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def _plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _latency_ms(loop, call) -> float:
+    """Median wall time of the call after a warm-up run."""
+    loop.run_until_complete(call())
+    timings = []
+    for _ in range(LATENCY_RUNS):
+        started = time.perf_counter()
+        loop.run_until_complete(call())
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def assert_hot_query(loop, call, pick, expected_indexes, big_tables, budget_ms):
+    """Run `call`, EXPLAIN the statement `pick` selects from the SQL it issued, and check the plan and latency.
+
+    The plan must scan at least one of `expected_indexes` and never seq-scan `big_tables`.
+    """
+    with captured_statements() as statements:
+        loop.run_until_complete(call())
+    matching = [(statement, parameters) for statement, parameters in statements if pick(statement)]
+    assert matching, f"No matching statement among: {[statement for statement, _ in statements]}"
+    statement, parameters = matching[0]
+
+    plan = loop.run_until_complete(_explain(statement, parameters))
+    nodes = list(_plan_nodes(plan))
+    used_indexes = {node["Index Name"] for node in nodes if "Index Name" in node}
+    seq_scanned = {node.get("Relation Name") for node in nodes if node["Node Type"] == "Seq Scan"}
+    plan_text = json.dumps(plan, indent=2)
+
+    assert used_indexes & set(expected_indexes), f"Expected one of {expected_indexes}, plan:\n{plan_text}"
+    assert not seq_scanned & set(big_tables), f"Seq scan on {seq_scanned & set(big_tables)}, plan:\n{plan_text}"
+
+    latency = _latency_ms(loop, call)
+    budget = budget_ms * LATENCY_SCALE
+    assert latency <= budget, f"Median latency {latency:.1f} ms is over the {budget:.0f} ms budget"
+
+
+def _is_select_from(table: str):
+    return lambda statement: statement.lstrip().upper().startswith("SELECT") and f"FROM {table}" in statement
+
+
+def test_get_user_jobs(loop):
+    user_id = _seed_id("user", 1)
+    assert_hot_query(
+        loop,
+        lambda: get_user_jobs(user_id),
+        _is_select_from("jobs"),
+        expected_indexes=["ix_jobs_user_updated"],
+        big_tables=["jobs"],
+        budget_ms=25,
+    )
+
+
+@pytest.mark.parametrize("sort, expected_index", [
+    ("score", "ix_job_listing_scores_job_score"),
+    ("newest", "ix_job_listing_scores_job_created"),
+])
+def test_get_job_with_listings(loop, sort, expected_index):
+    job_id, user_id = _seed_id("job", 0), _seed_id("user", 0)
+
+    async def first_two_pages():
+        _, cursor = await get_job_with_listings(job_id, user_id, sort=sort)
+        assert cursor
+        await get_job_with_listings(job_id, user_id, sort=sort, cursor=cursor)
+
+    assert_hot_query(
+        loop,
+        first_two_pages,
+        lambda statement: "job_listing_scores" in statement and "LIMIT" in statement.upper(),
+        expected_indexes=[expected_index],
+        big_tables=["job_listing_scores", "listings", "jobs"],
+        budget_ms=60,
+    )
+
+
+def test_get_pending_evaluation_listing_ids(loop):
+    job_id = _seed_id("job", 0)
+    assert_hot_query(
+        loop,
+        lambda: get_pending_evaluation_listing_ids(job_id),
+        _is_select_from("job_listing_scores"),
+        expected_indexes=["ix_job_listing_scores_pending"],
+        big_tables=["job_listing_scores", "listings"],
+        budget_ms=40,
+    )
+
+
+def test_get_listings_due_for_liveness_check(loop):
+    assert_hot_query(
+        loop,
+        lambda: get_listings_due_for_liveness_check(LIVENESS_BATCH_SIZE),
+        _is_select_from("listings"),
+        expected_indexes=["ix_listings_liveness_due"],
+        big_tables=["listings"],
+        budget_ms=30,
+    )
+
+
+def test_verify_code(loop):
+    # A wrong code exercises the same lookup without consuming a code or signing a token
+    attempt = VerifyCode(email=f"user1@{EMAIL_DOMAIN}", code="not-a-code")
+
+    async def verify():
+        with pytest.raises(HTTPException):
+            await verify_code(attempt)
+
+    assert_hot_query(
+        loop,
+        verify,
+        _is_select_from("verification_codes"),
+        expected_indexes=["ix_verification_codes_unused"],
+        big_tables=["verification_codes"],
+        budget_ms=15,
+    )
+
+
+def test_claim_due_jobs(loop):
+    assert_hot_query(
+        loop,
+        lambda: claim_due_jobs(5),
+        lambda statement: "FOR UPDATE" in statement.upper(),
+        expected_indexes=["ix_jobs_next_run_at"],
+        big_tables=["jobs"],
+        budget_ms=25,
+    )